@@ -0,0 +1,26 @@
+__all__ = [
+    "DEFAULT_FLAGS",
+    "Budget",
+    "Flags",
+    "Snapshot",
+    "Violation",
+    "check_incrementally",
+    "check_source",
+    "check_tree",
+]
+
+_INCREMENTAL = ("Snapshot", "check_incrementally")
+
+
+def __getattr__(name: str) -> object:
+    # Importing the checker imports flake8, which the thin client in
+    # :mod:`.client` avoids.
+    if name in _INCREMENTAL:
+        from flake8_typing_collections import incremental
+
+        return getattr(incremental, name)
+    if name in __all__:
+        from flake8_typing_collections import checker
+
+        return getattr(checker, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,16 +8,53 @@ the module `xml.etree.ElementTree` or the class of the same name within
 that module, depending on the surrounding imports.
 This module tries to decode these situations and return the full name
 of the object in question.
+
+There are two backends. The ``ast`` backend, :class:`ModuleResolver`,
+gives each block of statements its own scope. The ``symtable`` backend,
+:class:`SymtableResolver`, uses the symbol tables that :mod:`symtable`
+computes to find the scopes that Python itself uses. Both implement the
+same interface, and :func:`make_resolver` creates either.
 """
 
 import ast
 import collections
+import functools
+import hashlib
 import itertools
-from typing import Dict, Iterable, List, Sequence, Union
+import symtable
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# Maps each alias of a single block to its full name. Aliases that are
+# defined ambiguously within the block map to None.
+ScopeTable = Dict[str, Optional[str]]
+ScopeChain = Tuple[ScopeTable, ...]
+# The aliases defined by the import statements of a block, as pairs of an
+# alias and a full name, and the aliases defined by its assign statements,
+# as pairs of a target and a value. Together, they determine the alias table.
+Contributions = Tuple[Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str], ...]]
+
+# The number of distinct module-level alias tables that are kept in memory.
+MODULE_TABLE_CACHE_SIZE = 1024
+
+# The names of all backends, for :func:`make_resolver`.
+BACKENDS = ("ast", "symtable")
+DEFAULT_BACKEND = "ast"
 
 
 def decode(
-    whole_tree: ast.AST, node_in_question: Union[ast.Name, ast.Attribute]
+    whole_tree: ast.AST,
+    node_in_question: Union[ast.Name, ast.Attribute],
+    backend: str = DEFAULT_BACKEND,
+    source: Optional[str] = None,
 ) -> str:
     """
     Decodes the object in question.
@@ -39,29 +76,460 @@ def decode(
     the checker always assume for the "try" to succeed and skips "catch"
     segments.
 
+    This function indexes the whole tree on every call. When decoding more
+    than a single node of the same tree, use :func:`make_resolver` instead.
+
     :param whole_tree: The entire AST in which the node is contained in.
     :param node_in_question: The node of type :class:`ast.Name` or :class:`ast.Attribute`, that is to be decoded.
+    :param backend: The backend to decode with, one of :data:`BACKENDS`.
+    :param source: The source code of the tree, for the ``symtable`` backend. It is optional, but saves regenerating it.
     :return: The complete name of the given identifier as a string. If no better match can be found, the name stored within the :class:`ast.Name` node is returned.
     :raises: The node in question and all its descendents must be of type :class:`ast.Name` or :class:`ast.Attribute`, otherwise a :class:`TypeError` will be raised.
     :raises: If the node describes an empty identifier, a :class:`ValueError` is raised.
     """
-    node_id = _build_node_identifier(node_in_question).split(".")
-    if not node_id:
-        raise ValueError("Cannot decode an empty identifier.")
-    ancestors = _ast_ancestors(whole_tree, node_in_question)
-    statements_to_analyze = list(_relevant_statements(ancestors))
-    alias_dict = _analyze(statements_to_analyze)
-
-    for i in range(len(node_id)):
-        lhs = ".".join(node_id[: len(node_id) - i])
-        rhs = ".".join(node_id[len(node_id) - i :])
-        if lhs in alias_dict:
-            lhs = alias_dict[lhs]
-            break
-    if lhs and rhs:
-        return lhs + "." + rhs
-    else:
-        return lhs + rhs
+    return make_resolver(whole_tree, backend, source).decode(node_in_question)
+
+
+def make_resolver(
+    tree: ast.AST, backend: str = DEFAULT_BACKEND, source: Optional[str] = None
+) -> "ModuleResolver":
+    """
+    Creates a resolver to decode any number of nodes within a single tree.
+
+    :param tree: The entire AST in which all nodes to decode are contained in.
+    :param backend: The backend to decode with, one of :data:`BACKENDS`.
+    :param source: The source code of the tree, for the ``symtable`` backend.
+    :return: The resolver.
+    :raises: If the backend is unknown, or the ``symtable`` backend is not given the source code on Python 3.8, a :class:`ValueError` is raised.
+    """
+    if backend == "ast":
+        return ModuleResolver(tree)
+    if backend == "symtable":
+        return SymtableResolver(tree, source)
+    raise ValueError(f"Unknown backend {backend!r}.")
+
+
+class ModuleResolver:
+    """
+    Decodes any number of nodes within a single tree.
+
+    The tree is indexed once on construction. Only statements and other
+    nodes containing statements are visited, expressions are indexed
+    lazily when they are decoded without telling their enclosing statement.
+    Each block (the module, class and function bodies, control flow blocks,
+    ...) gets its own table of aliases, which is computed at most once.
+    Decoding a node then only looks up its name in the tables of its
+    enclosing blocks, from the innermost to the outermost one. See
+    :func:`decode` for a description of the decoding process itself.
+
+    The tree must not be modified while the resolver is in use.
+    """
+
+    def __init__(self, tree: ast.AST):
+        """
+        :param tree: The entire AST in which all nodes to decode are contained in.
+        """
+        self.tree = tree
+        self._parents: Dict[ast.AST, ast.AST] = {}
+        self._expressions_indexed = False
+        self._blocks: List[ast.AST] = []
+        # All blocks whose alias table might not be empty.
+        self._alias_blocks: Dict[ast.AST, None] = {}
+        stack = [tree]
+        while stack:
+            parent = stack.pop()
+            self._blocks.append(parent)
+            children = list(_child_blocks(parent))
+            for child in children:
+                self._parents[child] = parent
+                if isinstance(child, _RELEVANT_TYPES):
+                    self._alias_blocks[parent] = None
+                    if isinstance(parent, ast.Try) and parent in self._parents:
+                        self._alias_blocks[self._parents[parent]] = None
+            stack.extend(reversed(children))
+        self._scope_tables: Dict[ast.AST, ScopeTable] = {}
+        self._scope_chains: Dict[ast.AST, ScopeChain] = {}
+        self._fingerprints: Dict[ast.AST, bytes] = {}
+        self._table_digests: Dict[int, bytes] = {}
+
+    def blocks(self) -> Iterable[ast.AST]:
+        """
+        Iterates over the root and all statements within the tree, as well as
+        other nodes containing statements, such as exception handlers.
+
+        :return: An iteration over the nodes, in the order of the source code.
+        """
+        return iter(self._blocks)
+
+    def decode(
+        self,
+        node_in_question: Union[ast.Name, ast.Attribute],
+        statement: Optional[ast.AST] = None,
+    ) -> str:
+        """
+        Decodes the object in question, as described by :func:`decode`.
+
+        :param node_in_question: The node of type :class:`ast.Name` or :class:`ast.Attribute`, that is to be decoded.
+        :param statement: The innermost statement containing the node, if known. This saves the resolver from indexing expressions.
+        :return: The complete name of the given identifier as a string.
+        :raises: See :func:`decode`.
+        """
+        node_id = _build_node_identifier(node_in_question).split(".")
+        if not node_id:
+            raise ValueError("Cannot decode an empty identifier.")
+        scope_chain = self._decoding_chain(
+            node_in_question if statement is None else statement
+        )
+
+        for i in range(len(node_id)):
+            lhs = ".".join(node_id[: len(node_id) - i])
+            rhs = ".".join(node_id[len(node_id) - i :])
+            fullname = _lookup(scope_chain, lhs)
+            if fullname is not None:
+                lhs = fullname
+                break
+        if lhs and rhs:
+            return lhs + "." + rhs
+        else:
+            return lhs + rhs
+
+    def ancestors(self, node: ast.AST) -> List[ast.AST]:
+        """
+        Finds a list of ancestors from a given node to the root of the tree.
+
+        :param node: A node within the tree.
+        :return: A list of nodes such that the first value is ``node``, the last value is the root, and each list element is a child node of its successive element.
+        :raises: If ``node`` is not contained in the tree, a :class:`KeyError` is raised.
+        """
+        ancestors = [node]
+        while node is not self.tree:
+            node = self._parent(node)
+            ancestors.append(node)
+        return ancestors
+
+    def scope_chain(self, node: ast.AST) -> ScopeChain:
+        """
+        Finds the alias tables of all blocks enclosing the given node.
+
+        The returned tables are shared between all nodes of the same block
+        and must not be modified.
+
+        :param node: A node within the tree.
+        :return: The non-empty alias tables, as described by :func:`_analyze`, ordered from the innermost to the outermost block.
+        """
+        block = self._enclosing_block(node)
+        scope_chain = self._scope_chains.get(block)
+        if scope_chain is None:
+            if block is self.tree:
+                enclosing: ScopeChain = ()
+            else:
+                enclosing = self.scope_chain(self._parents[block])
+            statements = _relevant_statements([block])
+            if block is self.tree:
+                table = _analyze_module(_contributions(statements))
+            else:
+                table = _analyze(list(statements), enclosing)
+            scope_chain = (table,) + enclosing if table else enclosing
+            self._scope_tables[block] = table
+            self._scope_chains[block] = scope_chain
+        return scope_chain
+
+    def scope_fingerprint(self, node: ast.AST) -> bytes:
+        """
+        Fingerprints the alias tables of all blocks enclosing the given node.
+
+        Identifiers decode to the same full names in all places with the same
+        fingerprint, even within different trees.
+
+        :param node: A node within the tree.
+        :return: A digest of the tables in :meth:`scope_chain`.
+        """
+        block = self._enclosing_block(node)
+        fingerprint = self._fingerprints.get(block)
+        if fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for table in self._fingerprinted_chain(block):
+                table_digest = self._table_digests.get(id(table))
+                if table_digest is None:
+                    table_digest = hashlib.blake2b(
+                        repr(sorted(table.items())).encode(), digest_size=16
+                    ).digest()
+                    self._table_digests[id(table)] = table_digest
+                digest.update(table_digest)
+            fingerprint = digest.digest()
+            self._fingerprints[block] = fingerprint
+        return fingerprint
+
+    @property
+    def tables_built(self) -> int:
+        """The number of blocks whose alias table has been computed so far."""
+        return len(self._scope_tables)
+
+    def scope_tables(
+        self, within: Optional[Callable[[ast.AST], bool]] = None
+    ) -> Iterable[ScopeTable]:
+        """
+        Finds the alias tables of all blocks within the tree.
+
+        :param within: A predicate telling which blocks to include. Defaults to all blocks.
+        :return: An iteration over all non-empty alias tables, as described by :func:`_analyze`.
+        """
+        for block in self._alias_blocks:
+            if within is not None and not within(block):
+                continue
+            self.scope_chain(block)
+            table = self._scope_tables[block]
+            if table:
+                yield table
+
+    def _decoding_chain(self, node: ast.AST) -> ScopeChain:
+        """
+        :return: The alias tables to decode the names of a node with, or of all nodes of a statement.
+        """
+        return self.scope_chain(node)
+
+    def _fingerprinted_chain(self, block: ast.AST) -> ScopeChain:
+        """
+        :return: All alias tables that decoding the names of a block may use, for :meth:`scope_fingerprint`.
+        """
+        return self.scope_chain(block)
+
+    def _enclosing_block(self, node: ast.AST) -> ast.AST:
+        while not isinstance(node, _BLOCK_TYPES) and node is not self.tree:
+            node = self._parent(node)
+        return node
+
+    def _parent(self, node: ast.AST) -> ast.AST:
+        parent = self._parents.get(node)
+        if parent is None and not self._expressions_indexed:
+            for parent in ast.walk(self.tree):
+                for child in ast.iter_child_nodes(parent):
+                    self._parents.setdefault(child, parent)
+            self._expressions_indexed = True
+            parent = self._parents.get(node)
+        if parent is None:
+            raise KeyError(f"{node} is not contained in the tree.")
+        return parent
+
+
+class SymtableResolver(ModuleResolver):
+    """
+    Decodes any number of nodes within a single tree, like
+    :class:`ModuleResolver`, but with the scopes of Python.
+
+    Each module, class and function is a scope, and its alias table holds
+    the aliases of all statements within it, including those within
+    ``if``, ``with`` and loop statements. As in :func:`decode`, only the
+    ``try`` blocks of "try-catch" constructs count. Class scopes are not
+    visible to the functions within them, and the names in the header of
+    a class or function, such as annotations of arguments, are decoded in
+    the enclosing scope. The symbol table of the module, computed by
+    :mod:`symtable` when it is first needed, tells which names are local
+    to each scope: names that are declared ``global`` or ``nonlocal`` do
+    not define aliases, and local names that are not aliases, such as
+    arguments, hide the aliases of enclosing scopes.
+    """
+
+    def __init__(self, tree: ast.AST, source: Optional[str] = None):
+        """
+        :param tree: The entire AST in which all nodes to decode are contained in.
+        :param source: The source code of the tree. If it is not given or does not match the tree, the source code is regenerated from the tree, if possible.
+        :raises: If the source code is not given and cannot be regenerated, as on Python 3.8, a :class:`ValueError` is raised.
+        """
+        # ast.unparse is new in Python 3.9.
+        if source is None and not hasattr(ast, "unparse"):
+            raise ValueError(
+                "The symtable backend needs the source code on Python 3.8."
+            )
+        super().__init__(tree)
+        self.source = source
+        self._symbol_tables: Optional[Dict[ast.AST, symtable.SymbolTable]] = (
+            None
+        )
+        # All scopes whose alias table might not be empty.
+        self._alias_scopes = dict.fromkeys(
+            self._scope(block) for block in self._alias_blocks
+        )
+
+    def scope_chain(self, node: ast.AST) -> ScopeChain:
+        """
+        Finds the alias tables of all scopes that are visible within the
+        innermost scope enclosing the given node, which is the node itself
+        for classes and functions.
+
+        :param node: A node within the tree.
+        :return: The non-empty alias tables, ordered from the innermost to the outermost scope.
+        """
+        return self._chain(self._scope(node))
+
+    def scope_tables(
+        self, within: Optional[Callable[[ast.AST], bool]] = None
+    ) -> Iterable[ScopeTable]:
+        for scope in self._alias_scopes:
+            if within is not None and not within(scope):
+                continue
+            self._chain(scope)
+            table = self._scope_tables[scope]
+            if table:
+                yield table
+
+    def _decoding_chain(self, node: ast.AST) -> ScopeChain:
+        scope = self._scope(node)
+        if scope is not self.tree and self._enclosing_block(node) is scope:
+            # Only the header of a class or function can be decoded with the
+            # class or function as the enclosing statement.
+            return self._chain(self._scope(self._parent(scope)))
+        return self._chain(scope)
+
+    def _fingerprinted_chain(self, block: ast.AST) -> ScopeChain:
+        scope = self._scope(block)
+        if scope is not self.tree and block is scope:
+            return self._chain(scope) + self._decoding_chain(block)
+        return self._chain(scope)
+
+    def _scope(self, node: ast.AST) -> ast.AST:
+        """
+        :return: The innermost class, function or module enclosing a node, or the node itself if it is one.
+        """
+        block = self._enclosing_block(node)
+        while not isinstance(block, _SCOPE_TYPES) and block is not self.tree:
+            block = self._parent(block)
+        return block
+
+    def _chain(self, scope: ast.AST) -> ScopeChain:
+        scope_chain = self._scope_chains.get(scope)
+        if scope_chain is not None:
+            return scope_chain
+        statements = _scope_statements(scope)
+        if scope is self.tree:
+            enclosing: ScopeChain = ()
+            table = _analyze_module(_contributions(statements))
+        else:
+            outer = self._scope(self._parent(scope))
+            # The names of a class are not visible within nested scopes.
+            while isinstance(outer, ast.ClassDef):
+                outer = self._scope(self._parent(outer))
+            enclosing = self._chain(outer)
+            table = self._local_table(
+                scope, _analyze(list(statements), enclosing), enclosing
+            )
+        scope_chain = (table,) + enclosing if table else enclosing
+        self._scope_tables[scope] = table
+        self._scope_chains[scope] = scope_chain
+        return scope_chain
+
+    def _local_table(
+        self, scope: ast.AST, table: ScopeTable, enclosing: ScopeChain
+    ) -> ScopeTable:
+        """
+        Restricts the alias table of a class or function to its local names,
+        and hides the aliases of enclosing scopes that are local names.
+        """
+        symbols = self._symbol_table(scope)
+        if symbols is None:
+            return table
+
+        def is_local(alias: str) -> bool:
+            try:
+                return symbols.lookup(alias.split(".", 1)[0]).is_local()
+            except KeyError:
+                return False
+
+        local_table = {
+            alias: fullname
+            for alias, fullname in table.items()
+            if is_local(alias)
+        }
+        for enclosing_table in enclosing:
+            for alias in enclosing_table:
+                if alias not in local_table and is_local(alias):
+                    local_table[alias] = None
+        return local_table
+
+    def _symbol_table(self, scope: ast.AST) -> Optional[symtable.SymbolTable]:
+        if self._symbol_tables is None:
+            self._symbol_tables = self._map_symbol_tables()
+        return self._symbol_tables.get(scope)
+
+    def _map_symbol_tables(self) -> Dict[ast.AST, symtable.SymbolTable]:
+        """
+        Computes the symbol table of the module and maps the tables of its
+        classes and functions to their nodes, which are in the same order.
+
+        :return: The symbol tables of all classes and functions, or none if the source code cannot be compiled.
+        """
+        scopes = [
+            block
+            for block in self._blocks
+            if isinstance(block, _SCOPE_TYPES)
+            and block.name not in _ANONYMOUS_SCOPES
+        ]
+        for source in self._sources():
+            try:
+                module = symtable.symtable(source, "<module>", "exec")
+            except (SyntaxError, ValueError):
+                continue
+            tables = []
+            stack = list(reversed(module.get_children()))
+            while stack:
+                table = stack.pop()
+                if (
+                    table.get_type() in ("function", "class")
+                    and table.get_name() not in _ANONYMOUS_SCOPES
+                ):
+                    tables.append(table)
+                stack.extend(reversed(table.get_children()))
+            if [table.get_name() for table in tables] == [
+                scope.name for scope in scopes
+            ]:
+                return dict(zip(scopes, tables))
+        return {}
+
+    def _sources(self) -> Iterable[str]:
+        """
+        :return: An iteration over the given source code and the source code regenerated from the tree, if possible.
+        """
+        if self.source is not None:
+            yield self.source
+        # ast.unparse is new in Python 3.9.
+        if hasattr(ast, "unparse"):
+            yield ast.unparse(self.tree)
+
+
+# Nodes that may contain statements. Every node below the innermost of these
+# ancestors is an expression (or similar) and contributes no statements.
+_BLOCK_TYPES = tuple(
+    getattr(ast, name)
+    for name in ("mod", "stmt", "excepthandler", "match_case")
+    if hasattr(ast, name)
+)
+
+# Fields of blocks that contain statements or other blocks.
+_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+# Statements that may define aliases.
+_RELEVANT_TYPES = (ast.Import, ast.ImportFrom, ast.Assign)
+
+# The nodes of the scopes of :class:`SymtableResolver`, besides the module.
+_SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# The names of the symbol tables of lambdas and comprehensions.
+_ANONYMOUS_SCOPES = frozenset(
+    ("lambda", "genexpr", "listcomp", "setcomp", "dictcomp")
+)
+
+
+def _child_blocks(block: ast.AST) -> Iterable[ast.AST]:
+    """
+    Finds the statements and other blocks directly contained in a block.
+
+    :param block: A block, as in :data:`_BLOCK_TYPES`.
+    :return: An iteration over the child blocks, in the order of the source code.
+    """
+    for field in _BLOCK_FIELDS:
+        children = getattr(block, field, None)
+        if isinstance(children, list):
+            yield from children
 
 
 def _build_node_identifier(node: Union[ast.Name, ast.Attribute]) -> str:
@@ -85,71 +553,105 @@ def _build_node_identifier(node: Union[ast.Name, ast.Attribute]) -> str:
         )
 
 
-def _ast_ancestors(tree: ast.AST, node: ast.AST) -> List[ast.AST]:
-    """
-    Finds a list of ancestors from a given node to its root.
-
-    :param tree: The root of the given ast.
-    :param node: A node within the given ast.
-    :return: A list of nodes such that the first value is ``node``, the last value is ``tree``, and each list element is a child node of its successive element.
-    :raises: ``tree`` must be an ancestor of ``node``, i.e. ``node`` must be containedi in ``ast.walk(tree)``. Otherwise, a :class:`KeyError` is raised.
-    """
-    parent_map = {}
-    for parent in ast.walk(tree):
-        for child in ast.iter_child_nodes(parent):
-            parent_map[child] = parent
-    ancestors = [node]
-    while node != tree:
-        node = parent_map[node]
-        ancestors.append(node)
-    return ancestors
-
-
 def _relevant_statements(ancestors: List[ast.AST]) -> Iterable[ast.AST]:
     """
     Given a list of ancestors, finds the statements to analyze.
 
-    Given a list of ancestors, as described by :func:`_ast_ancestors`, finds
+    Given a list of ancestors, as described by :meth:`ModuleResolver.ancestors`, finds
     all statements in the tree that are considered "worthy to be analyzed".
     In general, these are all child nodes of any ancestor that represent
     import statements or assign statements.
 
-    :param ancestors: The list of ancestors, as described by :func:`_ast_ancestors`.
+    :param ancestors: The list of ancestors, as described by :meth:`ModuleResolver.ancestors`.
     :return: An iteration over the relevant nodes.
     """
-    acceptable_types = [ast.Import, ast.ImportFrom, ast.Assign]
     for ancestor in ancestors:
-        for child in ast.iter_child_nodes(ancestor):
-            if any(isinstance(child, t) for t in acceptable_types):
+        for child in _child_blocks(ancestor):
+            if isinstance(child, _RELEVANT_TYPES):
                 yield child
             elif isinstance(child, ast.Try):
                 for grandchild in itertools.chain(
                     child.body, child.finalbody, child.orelse
                 ):
-                    if any(isinstance(grandchild, t) for t in acceptable_types):
+                    if isinstance(grandchild, _RELEVANT_TYPES):
                         yield grandchild
 
 
-def _analyze(statements: Sequence[ast.AST]) -> Dict[str, str]:
+def _scope_statements(scope: ast.AST) -> Iterable[ast.AST]:
+    """
+    Finds the statements to analyze for a scope of :class:`SymtableResolver`:
+    all statements that may define aliases within the scope, but not within
+    nested scopes or the exception handlers of "try-catch" constructs.
+
+    :param scope: A class, function or module.
+    :return: An iteration over the statements, in the order of the source code.
+    """
+    stack = list(reversed(list(_child_blocks(scope))))
+    while stack:
+        block = stack.pop()
+        if isinstance(block, _RELEVANT_TYPES):
+            yield block
+        elif not isinstance(block, _SCOPE_TYPES + (ast.ExceptHandler,)):
+            stack.extend(reversed(list(_child_blocks(block))))
+
+
+def _analyze(
+    statements: Sequence[ast.AST], enclosing: ScopeChain = ()
+) -> ScopeTable:
     """
     Analyzes the given list of statements for all possible identifiers.
 
     The returned dict will map each potential alias to its full name.
     Full names are not contained, so if an identifier is not present as a key,
-    it should be considered to be the full name already.
+    it should be considered to be the full name already. Aliases that are
+    defined more than once map to None, as their full name is unknown.
 
     :param statements: The sequence of statements, as returned by :func:`_relevant_statements`.
+    :param enclosing: The alias tables of all enclosing blocks, used to resolve the values of assign statements.
     :return: A dict mapping aliases to full names.
     """
-    potential_aliases = collections.defaultdict(list)
+    return _analyze_contributions(_contributions(statements), enclosing)
+
+
+@functools.lru_cache(maxsize=MODULE_TABLE_CACHE_SIZE)
+def _analyze_module(contributions: Contributions) -> ScopeTable:
+    """
+    Analyzes the statements of a module, like :func:`_analyze`.
+
+    Many modules of a code base share the same imports, so the alias tables
+    of modules are cached by their contributions, across all trees. The
+    returned table is shared and must not be modified.
+
+    :param contributions: The contributions of the module's statements, as returned by :func:`_contributions`.
+    :return: A dict mapping aliases to full names.
+    """
+    return _analyze_contributions(contributions, ())
+
+
+def _contributions(statements: Iterable[ast.AST]) -> Contributions:
+    """
+    Extracts the aliases that the given statements may define.
+
+    :param statements: The statements, as returned by :func:`_relevant_statements`.
+    :return: The aliases defined by import statements and by assign statements.
+    """
+    imports = []
     assignments = []
     for statement in statements:
         if isinstance(statement, ast.Assign):
-            assignments.append(statement)
+            if len(statement.targets) == 1 and isinstance(
+                statement.value, (ast.Name, ast.Attribute)
+            ):
+                try:
+                    value_identifier = _build_node_identifier(statement.value)
+                    target = _build_node_identifier(statement.targets[0])
+                except TypeError:
+                    continue
+                assignments.append((target, value_identifier))
         elif isinstance(statement, ast.Import):
             for alias in statement.names:
                 if alias.asname is not None:
-                    potential_aliases[alias.asname].append(alias.name)
+                    imports.append((alias.asname, alias.name))
         elif isinstance(statement, ast.ImportFrom):
             for alias in statement.names:
                 if statement.module is not None:
@@ -162,28 +664,46 @@ def _analyze(statements: Sequence[ast.AST]) -> Dict[str, str]:
                 else:
                     fullname = ("." * statement.level) + alias.name
                 if alias.asname is None:
-                    potential_aliases[alias.name].append(fullname)
+                    imports.append((alias.name, fullname))
                 else:
-                    potential_aliases[alias.asname].append(fullname)
+                    imports.append((alias.asname, fullname))
         else:
             raise KeyError(f"{statement} cannot be analyzed.")
+    return tuple(imports), tuple(assignments)
 
-    for statement in assignments:
-        if isinstance(statement.value, ast.Name) or isinstance(
-            statement.value, ast.Attribute
-        ):
-            if len(statement.targets) == 1:
-                try:
-                    value_identifier = _build_node_identifier(statement.value)
-                    target = _build_node_identifier(statement.targets[0])
-                except TypeError:
-                    continue
-                potential_aliases[target] += potential_aliases.get(
-                    value_identifier, [value_identifier]
-                )
+
+def _analyze_contributions(
+    contributions: Contributions, enclosing: ScopeChain
+) -> ScopeTable:
+    imports, assignments = contributions
+    potential_aliases = collections.defaultdict(list)
+    for alias, fullname in imports:
+        potential_aliases[alias].append(fullname)
+    for target, value_identifier in assignments:
+        if value_identifier in potential_aliases:
+            potential_aliases[target] += potential_aliases[value_identifier]
+        elif any(value_identifier in table for table in enclosing):
+            potential_aliases[target].append(
+                _lookup(enclosing, value_identifier)
+            )
+        else:
+            potential_aliases[target].append(value_identifier)
 
     return {
-        alias: fullnames[0]
+        alias: fullnames[0] if len(fullnames) == 1 else None
         for alias, fullnames in potential_aliases.items()
-        if len(fullnames) == 1
     }
+
+
+def _lookup(scope_chain: ScopeChain, alias: str) -> Optional[str]:
+    """
+    Looks up an alias in a chain of alias tables.
+
+    :param scope_chain: The alias tables, ordered from the innermost to the outermost block.
+    :param alias: The alias to look up.
+    :return: The full name from the innermost table that defines the alias, or None if no table does so or the definition is ambiguous.
+    """
+    for table in scope_chain:
+        if alias in table:
+            return table[alias]
+    return None
@@ -0,0 +1,11 @@
+"""
+Benchmarks for the checker and the import alias decoder.
+
+Run them with::
+
+    python -m flake8_typing_collections.bench [--output results.json]
+
+The benchmarks run on synthetic modules, generated by
+:mod:`flake8_typing_collections.bench.synthetic`, as well as on the
+standard library of the running Python interpreter.
+"""
@@ -0,0 +1,6 @@
+import sys
+
+from flake8_typing_collections.bench.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
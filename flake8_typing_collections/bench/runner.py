@@ -0,0 +1,274 @@
+"""
+Measures the checker phase by phase on several corpora.
+
+The phases are:
+
+* ``index``: Indexing the statements of a module and building the alias
+  tables that the candidate names are derived from.
+* ``traversal``: Finding all annotations.
+* ``decode``: Decoding the candidate names within the annotations.
+* ``matching``: Looking up the decoded names in the rules.
+
+Parsing is not part of the checker and not measured. With ``--resolver``,
+the corpora are measured with each of the given backends of
+:mod:`flake8_typing_collections.ast_import_decode`, for comparing them.
+"""
+
+import argparse
+import ast
+import dataclasses
+import importlib.util
+import json
+import os
+import platform
+import sysconfig
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from flake8_typing_collections import ast_import_decode
+from flake8_typing_collections.bench import synthetic
+from flake8_typing_collections.checker import Checker, Flags, compile_rules
+
+PHASES = ("index", "traversal", "decode", "matching")
+
+# The synthetic corpora, as keyword arguments to :func:`synthetic.module`.
+SYNTHETIC_CORPORA = {
+    "annotations": dict(functions=2000),
+    "imports": dict(functions=200, imports=2000),
+    "nesting": dict(functions=200, nesting=20),
+    "attribute-chains": dict(functions=200, attribute_chain=20),
+    "try-blocks": dict(functions=200, try_blocks=500),
+}
+
+ALL_FLAGS = Flags(generic_alt=True, alias_alt=True, general_args=True)
+
+
+@dataclasses.dataclass
+class Result:
+    """
+    The measurements of a single corpus.
+
+    :ivar files: The number of files in the corpus.
+    :ivar lines: The number of lines in the corpus.
+    :ivar annotations: The number of annotations found.
+    :ivar decoded_names: The number of names that were decoded.
+    :ivar errors: The number of errors reported.
+    :ivar phases: The time spent in each phase, in seconds. For each phase, the fastest of all repetitions is taken.
+    """
+
+    files: int = 0
+    lines: int = 0
+    annotations: int = 0
+    decoded_names: int = 0
+    errors: int = 0
+    phases: Dict[str, float] = dataclasses.field(
+        default_factory=lambda: dict.fromkeys(PHASES, 0.0)
+    )
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.total if self.total else 0.0
+
+
+def measure(
+    sources: Sequence[str],
+    repeat: int = 3,
+    backend: str = ast_import_decode.DEFAULT_BACKEND,
+) -> Result:
+    """
+    Measures the checker on a corpus.
+
+    :param sources: The source code of all modules in the corpus. Modules that cannot be parsed are skipped.
+    :param repeat: How often to measure the corpus.
+    :param backend: The backend to decode names with.
+    :return: The measurements.
+    """
+    trees = []
+    result = Result()
+    for source in sources:
+        try:
+            trees.append((ast.parse(source), source.splitlines(keepends=True)))
+        except (SyntaxError, ValueError):
+            continue
+        result.files += 1
+        result.lines += source.count("\n") + 1
+    rules = compile_rules(ALL_FLAGS)
+    for i in range(repeat):
+        # Each repetition starts cold, like a new process.
+        ast_import_decode._analyze_module.cache_clear()
+        rules.verdicts.clear()
+        phases = dict.fromkeys(PHASES, 0.0)
+        annotations = decoded_names = errors = 0
+        for tree, lines in trees:
+            checker = Checker(tree, lines, rules=rules)
+            checker.resolver_backend = backend
+            start = time.perf_counter()
+            checker.candidate_names = checker._candidate_names()
+            indexed = time.perf_counter()
+            annotation_sites = list(checker._annotation_sites())
+            traversed = time.perf_counter()
+            decoded = checker._decode(annotation_sites)
+            decoded_at = time.perf_counter()
+            matched = list(checker._match(decoded))
+            end = time.perf_counter()
+            phases["index"] += indexed - start
+            phases["traversal"] += traversed - indexed
+            phases["decode"] += decoded_at - traversed
+            phases["matching"] += end - decoded_at
+            annotations += len(annotation_sites)
+            decoded_names += checker.decode_calls
+            errors += len(matched)
+        for phase in PHASES:
+            result.phases[phase] = (
+                phases[phase]
+                if i == 0
+                else min(result.phases[phase], phases[phase])
+            )
+        result.annotations = annotations
+        result.decoded_names = decoded_names
+        result.errors = errors
+    return result
+
+
+def stdlib_sources(limit: Optional[int] = None) -> List[str]:
+    """
+    Reads the modules of the standard library of the running interpreter.
+
+    :param limit: The maximum number of modules to read.
+    :return: The source code of the modules.
+    """
+    sources = []
+    for filename in _stdlib_files():
+        if limit is not None and len(sources) >= limit:
+            break
+        try:
+            with open(filename, "rb") as f:
+                sources.append(importlib.util.decode_source(f.read()))
+        except (OSError, SyntaxError, UnicodeDecodeError):
+            continue
+    return sources
+
+
+def _stdlib_files() -> Iterable[str]:
+    root = sysconfig.get_paths()["stdlib"]
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(
+            d
+            for d in subdirectories
+            if d not in ("site-packages", "__pycache__")
+        )
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(directory, filename)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the benchmarks and prints a table of the results.
+
+    :param argv: The command line arguments, excluding the program name. Defaults to :data:`sys.argv`.
+    :return: The exit code.
+    """
+    corpus_names = list(SYNTHETIC_CORPORA) + ["stdlib"]
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_typing_collections.bench",
+        description="Measures the checker phase by phase on several corpora.",
+    )
+    parser.add_argument(
+        "--corpus",
+        action="append",
+        choices=corpus_names,
+        help="A corpus to measure. Can be given multiple times. (Default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="A factor for the size of the synthetic corpora. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stdlib_limit",
+        type=int,
+        default=None,
+        help="The maximum number of standard library modules to measure.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="How often to measure each corpus. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--resolver",
+        action="append",
+        choices=ast_import_decode.BACKENDS,
+        help="A backend to decode names with. Can be given multiple times to compare them. (Default: %s)"
+        % ast_import_decode.DEFAULT_BACKEND,
+    )
+    parser.add_argument(
+        "--output", help="Write the results to this file as JSON."
+    )
+    options = parser.parse_args(argv)
+    backends = options.resolver or [ast_import_decode.DEFAULT_BACKEND]
+
+    results = {}
+    for name in options.corpus or corpus_names:
+        if name == "stdlib":
+            sources = stdlib_sources(options.stdlib_limit)
+        else:
+            sources = [
+                synthetic.module(
+                    **{
+                        parameter: _scaled(value, options.scale)
+                        for parameter, value in SYNTHETIC_CORPORA[name].items()
+                    }
+                )
+            ]
+        for backend in backends:
+            key = name if len(backends) == 1 else f"{name} ({backend})"
+            results[key] = measure(sources, options.repeat, backend)
+
+    _print_table(results)
+    if options.output is not None:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump(_to_json(results), f, indent=2)
+    return 0
+
+
+def _scaled(value: int, scale: float) -> int:
+    return max(1, round(value * scale))
+
+
+def _print_table(results: Dict[str, Result]) -> None:
+    header = ["corpus", "files", "lines", "annotations"]
+    header += [f"{phase} [ms]" for phase in PHASES]
+    header += ["total [ms]", "lines/s"]
+    rows = [header]
+    for name, result in results.items():
+        row = [name, result.files, result.lines, result.annotations]
+        row += [f"{result.phases[phase] * 1000:.1f}" for phase in PHASES]
+        row += [f"{result.total * 1000:.1f}", f"{result.lines_per_second:.0f}"]
+        rows.append([str(cell) for cell in row])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def _to_json(results: Dict[str, Result]) -> dict:
+    return {
+        "python": platform.python_version(),
+        "version": Checker.version,
+        "phases": list(PHASES),
+        "results": {
+            name: dict(
+                dataclasses.asdict(result),
+                total=result.total,
+                lines_per_second=result.lines_per_second,
+            )
+            for name, result in results.items()
+        },
+    }
@@ -0,0 +1,98 @@
+"""
+Generates synthetic modules of parameterized size and shape.
+
+Each generator stresses a different dimension of the checker: the number
+of annotations, the number of imports, the nesting depth of annotations,
+the length of attribute chains and the number of try-except import blocks.
+"""
+
+from typing import List
+
+# Names that trigger errors, as (import statement, annotation).
+_TARGETS = [
+    ("from collections.abc import Iterable", "Iterable"),
+    ("import collections", "collections.OrderedDict"),
+    ("import typing", "typing.List"),
+    ("", "list"),
+    ("", "dict"),
+]
+# Names that do not trigger errors, as (import statement, annotation).
+_NON_TARGETS = [
+    ("from typing import Sequence", "Sequence"),
+    ("import typing", "typing.Optional"),
+    ("", "int"),
+    ("", "str"),
+    ("", "UserId"),
+]
+
+
+def module(
+    functions: int = 100,
+    imports: int = 10,
+    nesting: int = 1,
+    attribute_chain: int = 0,
+    try_blocks: int = 0,
+    body_statements: int = 5,
+) -> str:
+    """
+    Generates the source code of a module.
+
+    :param functions: The number of functions. Each function has three annotations: two arguments and the return type.
+    :param imports: The number of additional import statements at module level.
+    :param nesting: The depth of subscripts in each annotation, such as ``Dict[str, Dict[str, int]]`` for a depth of 2.
+    :param attribute_chain: If positive, annotations additionally refer to a module imported as a dotted name of this many segments.
+    :param try_blocks: The number of try-except blocks that import aliases.
+    :param body_statements: The number of ordinary statements in each function body.
+    :return: The source code.
+    """
+    lines = sorted({statement for statement, _ in _TARGETS + _NON_TARGETS})
+    lines = [line for line in lines if line]
+    lines.append("from typing import Dict")
+    for i in range(imports):
+        lines.append(f"from package{i}.module{i} import Name{i} as Alias{i}")
+    for i in range(try_blocks):
+        lines.extend(
+            [
+                "try:",
+                f"    from collections.abc import Sequence as Seq{i}",
+                "except ImportError:",
+                f"    from typing import Sequence as Seq{i}",
+            ]
+        )
+    chain = ".".join(f"segment{i}" for i in range(attribute_chain))
+    if chain:
+        lines.append(f"import {chain}")
+    for i in range(functions):
+        names = _TARGETS + _NON_TARGETS
+        annotations = [
+            _nested(names[(i + j) % len(names)][1], nesting) for j in range(3)
+        ]
+        if chain:
+            annotations[1] = _nested(f"{chain}.Name{i}", nesting)
+        if try_blocks:
+            annotations[2] = _nested(f"Seq{i % try_blocks}", nesting)
+        lines.append("")
+        lines.append(
+            f"def function{i}(a: {annotations[0]}, b: {annotations[1]})"
+            f" -> {annotations[2]}:"
+        )
+        lines.extend(_body(body_statements))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _nested(annotation: str, depth: int) -> str:
+    for _ in range(depth - 1):
+        annotation = f"Dict[str, {annotation}]"
+    return annotation
+
+
+def _body(statements: int) -> List[str]:
+    lines = ["    result = 0"]
+    for i in range(statements):
+        lines.append(
+            f"    result = result + len([x * {i} for x in range({i}) if x]) "
+            f"+ max(a or [0], key=lambda y: y % {i + 1})"
+        )
+    lines.append("    return result")
+    return lines
@@ -0,0 +1,255 @@
+"""
+Persists the results of checked files on disk.
+
+flake8 itself does not cache anything between runs, so every unchanged
+file would be checked again. The :class:`ResultCache` stores the results
+of each file under a key that is derived from everything the results
+depend on: the source code, the active error codes and the plugin version.
+Results that also depend on other files, such as the modules of a project
+that a file imports aliases from, are stored with the digests of these
+dependencies, and are only reused while the digests stay the same.
+The cache directory may be shared between concurrent processes, for
+example flake8's ``--jobs`` workers or parallel CI jobs.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# A single reported error, as (line, column, message).
+CachedResult = Tuple[int, int, str]
+
+# The digests of the dependencies of an entry, by the name of each dependency.
+Dependencies = Dict[str, str]
+
+# The results and dependencies of an entry.
+_Entry = Tuple[List[CachedResult], Optional[Dependencies]]
+
+# Temporary files of writers that crashed are removed after this many seconds.
+_STALE_TEMPORARY_AGE = 3600
+
+
+class ResultCache:
+    """
+    A directory of cached results, one file per entry.
+
+    Entries are written to a temporary file first and then atomically
+    renamed, so readers never see partial entries and concurrent writers of
+    the same entry do not conflict. Reading an entry marks it as recently
+    used. When :meth:`prune` is called, the least recently used entries are
+    evicted until the cache fits into its size limit again.
+
+    All errors while accessing the cache are treated as cache misses.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        """
+        :param directory: The directory to store the cache in. It is created if necessary.
+        :param max_size: The maximum size of all entries in bytes, enforced by :meth:`prune`.
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+    @staticmethod
+    def key(source: bytes, *context: str) -> str:
+        """
+        Derives the key of an entry.
+
+        :param source: The source code of the checked file.
+        :param context: Everything else that the results depend on.
+        :return: A hex digest identifying the entry.
+        """
+        digest = hashlib.sha256()
+        for part in context:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def get(
+        self, key: str, current: Optional[Callable[[str], str]] = None
+    ) -> Optional[List[CachedResult]]:
+        """
+        Reads an entry.
+
+        :param key: The key of the entry, as returned by :meth:`key`.
+        :param current: Computes the current digest of a dependency by its name. Entries with dependencies are only valid if all their digests are still the same.
+        :return: The cached results, or None if there is no valid entry.
+        """
+        entry = self._read(key)
+        if entry is None or not _unchanged(entry[1], current):
+            return None
+        return entry[0]
+
+    def put(
+        self,
+        key: str,
+        results: Iterable[CachedResult],
+        dependencies: Optional[Dependencies] = None,
+    ) -> None:
+        """
+        Writes an entry, replacing any previous entry of the same key.
+
+        :param key: The key of the entry, as returned by :meth:`key`.
+        :param results: The results to store.
+        :param dependencies: The digests of everything besides the key that the results depend on, if anything.
+        """
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temporary_path = tempfile.mkstemp(
+                dir=os.path.dirname(path), suffix=".tmp"
+            )
+        except OSError:
+            return
+        try:
+            entry: object = [list(result) for result in results]
+            if dependencies is not None:
+                entry = {"results": entry, "dependencies": dependencies}
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temporary_path, path)
+        except OSError:
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+    def prune(self) -> None:
+        """
+        Evicts the least recently used entries until the cache fits into its
+        size limit, and removes temporary files left behind by crashed writers.
+        """
+        entries = []
+        now = time.time()
+        for directory, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if filename.endswith(".json"):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                elif (
+                    filename.endswith(".tmp")
+                    and now - stat.st_mtime > _STALE_TEMPORARY_AGE
+                ):
+                    _remove(path)
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            _remove(path)
+            total_size -= size
+
+    def _read(self, key: str) -> Optional[_Entry]:
+        """
+        :return: The results and dependencies of an entry, whether they are still valid or not, or None if there is no entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+            dependencies = None
+            if isinstance(entry, dict):
+                entry, dependencies = entry["results"], entry["dependencies"]
+            if not isinstance(entry, list):
+                return None
+            return (
+                [(line, col, message) for line, col, message in entry],
+                dependencies,
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+
+class MemoryCache(ResultCache):
+    """
+    Keeps the most recently used results in memory, for long-running
+    processes like the daemon. Optionally, a :class:`ResultCache` on disk
+    is used for results that are not in memory.
+    """
+
+    def __init__(self, max_entries: int, backing: Optional[ResultCache] = None):
+        """
+        :param max_entries: The maximum number of entries kept in memory.
+        :param backing: The cache to read missing entries from and to write all entries to.
+        """
+        super().__init__(
+            backing.directory if backing is not None else "",
+            backing.max_size if backing is not None else 0,
+        )
+        self.max_entries = max_entries
+        self.backing = backing
+        self._entries: "collections.OrderedDict[str, _Entry]" = (
+            collections.OrderedDict()
+        )
+
+    def get(
+        self, key: str, current: Optional[Callable[[str], str]] = None
+    ) -> Optional[List[CachedResult]]:
+        entry = self._entries.get(key)
+        if entry is None and self.backing is not None:
+            entry = self.backing._read(key)
+            if entry is not None:
+                self._remember(key, *entry)
+        # Entries with changed dependencies are replaced by the next put.
+        if entry is None or not _unchanged(entry[1], current):
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(
+        self,
+        key: str,
+        results: Iterable[CachedResult],
+        dependencies: Optional[Dependencies] = None,
+    ) -> None:
+        results = list(results)
+        self._remember(key, results, dependencies)
+        if self.backing is not None:
+            self.backing.put(key, results, dependencies)
+
+    def prune(self) -> None:
+        if self.backing is not None:
+            self.backing.prune()
+
+    def _remember(
+        self,
+        key: str,
+        results: List[CachedResult],
+        dependencies: Optional[Dependencies],
+    ) -> None:
+        self._entries[key] = (results, dependencies)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _unchanged(
+    dependencies: Optional[Dependencies],
+    current: Optional[Callable[[str], str]],
+) -> bool:
+    """
+    :return: Whether the digests of all dependencies are still the same. Without a function to compute them, only entries without dependencies are.
+    """
+    if not dependencies:
+        return True
+    return current is not None and all(
+        current(name) == digest for name, digest in dependencies.items()
+    )
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,12 +1,38 @@
 import argparse
 import ast
+import bisect
+import collections
+import contextlib
 import dataclasses
+import functools
 import itertools
-from typing import Iterable, Optional, Tuple
+import re
+import time
+import unicodedata
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import flake8.options.manager
+import flake8.style_guide
 
 from flake8_typing_collections import ast_import_decode
+from flake8_typing_collections.cache import ResultCache
+from flake8_typing_collections.project import ProjectIndex
+from flake8_typing_collections.stats import Stats, StatsCollector
+from flake8_typing_collections.tracing import Trace, TraceCollector
 
 try:
     from importlib import metadata
@@ -59,6 +85,9 @@ ERROR_CODES_GENERAL_ARGS = {200, 201, 202}
 
 DEFAULT_FLAGS = Flags(generic_alt=True, alias_alt=False, general_args=True)
 
+# Reported once for files that exceed the budget, see :class:`Budget`.
+BUDGET_ERROR_CODE = "TYC001"
+
 BETTER_ALTERNATIVES = {
     100: ["collections.abc.Iterable"],
     101: ["collections.abc.Iterator"],
@@ -99,6 +128,292 @@ BETTER_ALTERNATIVES = {
 }
 
 
+@dataclasses.dataclass(frozen=True)
+class Rules:
+    """
+    The error codes that are active for a run, indexed by the full names
+    that trigger them.
+
+    :ivar annotations: The active TYC1xx codes, checked for every name in every annotation.
+    :ivar arguments: The active TYC2xx codes, checked for the outermost name of function argument annotations.
+    :ivar reports_budget: Whether :data:`BUDGET_ERROR_CODE` is reported for files that exceed the budget.
+    """
+
+    annotations: Dict[str, Tuple[int, ...]]
+    arguments: Dict[str, Tuple[int, ...]]
+    reports_budget: bool = True
+
+    @functools.cached_property
+    def fullnames(self) -> FrozenSet[str]:
+        """All full names that trigger any active error code."""
+        return frozenset(self.annotations) | frozenset(self.arguments)
+
+    @property
+    def error_codes(self) -> Tuple[int, ...]:
+        """All active error codes, in ascending order."""
+        error_codes = set()
+        for codes in itertools.chain(
+            self.annotations.values(), self.arguments.values()
+        ):
+            error_codes.update(codes)
+        return tuple(sorted(error_codes))
+
+    @property
+    def terminal_names(self) -> FrozenSet[str]:
+        """The last segments of all names in :attr:`fullnames`."""
+        return frozenset(name.rsplit(".", 1)[-1] for name in self.fullnames)
+
+    @functools.cached_property
+    def verdicts(self) -> "LRUMemo":
+        """
+        Memoizes which names of an annotation trigger these rules, shared by
+        all files checked with them. See :meth:`Checker._decode_memoized`.
+        """
+        return LRUMemo(VERDICT_MEMO_SIZE)
+
+    def may_report(self, source: str) -> bool:
+        """
+        Tells cheaply, without parsing the source code, whether any rule might
+        report an error within it.
+
+        Names only ever decode to a full name like ``typing.List`` through an
+        import of its first segment, and builtins like ``list`` are used by
+        their name, so the first segment of some full name has to appear as
+        a word in the source code.
+
+        :param source: The source code of a module.
+        :return: False if no rule can report any error in the source code.
+        """
+        if not self.fullnames:
+            return False
+        if not source.isascii():
+            # Identifiers are normalized by the parser.
+            source = unicodedata.normalize("NFKC", source)
+        return self._first_segments_pattern.search(source) is not None
+
+    @functools.cached_property
+    def _first_segments_pattern(self) -> "re.Pattern[str]":
+        first_segments = {name.split(".", 1)[0] for name in self.fullnames}
+        return re.compile(
+            r"\b(?:{})\b".format(
+                "|".join(map(re.escape, sorted(first_segments)))
+            )
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Budget:
+    """
+    Limits the work spent on a single file. Files exceeding any limit are
+    only checked partly, and a single TYC001 error is reported for them.
+
+    :ivar max_annotations: The maximum number of annotations to check, or None for no limit.
+    :ivar max_depth: The maximum number of nested subscripts within an annotation, such as 2 for ``Dict[str, List[int]]``, or None for no limit.
+    :ivar max_seconds: The maximum time to spend on decoding names, or None for no limit.
+    """
+
+    max_annotations: Optional[int] = None
+    max_depth: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+
+class LineRanges:
+    """
+    A set of line ranges, to only check the annotations overlapping them.
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]]):
+        """
+        :param ranges: Pairs of the first and last line of each range, in any order. Ranges may overlap.
+        """
+        self._firsts: List[int] = []
+        self._lasts: List[int] = []
+        for first, last in sorted(ranges):
+            if self._lasts and first <= self._lasts[-1] + 1:
+                self._lasts[-1] = max(self._lasts[-1], last)
+            else:
+                self._firsts.append(first)
+                self._lasts.append(last)
+
+    def __bool__(self) -> bool:
+        return bool(self._firsts)
+
+    def overlaps(self, first: int, last: int) -> bool:
+        """Tells whether any line from ``first`` to ``last`` is in a range."""
+        i = bisect.bisect_right(self._firsts, last) - 1
+        return i >= 0 and self._lasts[i] >= first
+
+
+class LRUMemo:
+    """
+    A dict of bounded size that evicts the least recently used entries.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: The maximum number of entries.
+        """
+        self.max_size = max_size
+        self._entries: "collections.OrderedDict[Hashable, object]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """
+        :return: The value of the entry, or None if there is none.
+        """
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: object) -> None:
+        self._entries[key] = value
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def compile_rules(
+    flags: Flags, is_selected: Callable[[str], bool] = lambda code: True
+) -> Rules:
+    """
+    Compiles the table of active rules.
+
+    :param flags: The flags that activate groups of error codes.
+    :param is_selected: A predicate telling whether an error code, such as ``"TYC100"``, is reported at all.
+    :return: The rules for all error codes that are both activated by the flags and selected.
+    """
+    active_error_codes = [
+        error_code
+        for error_code in BETTER_ALTERNATIVES
+        if _is_activated(flags, error_code) and is_selected(f"TYC{error_code}")
+    ]
+    return Rules(
+        annotations=_codes_by_name(c for c in active_error_codes if c < 200),
+        arguments=_codes_by_name(c for c in active_error_codes if c >= 200),
+        reports_budget=is_selected(BUDGET_ERROR_CODE),
+    )
+
+
+def _is_activated(flags: Flags, error_code: int) -> bool:
+    if error_code in ERROR_CODES_GENERIC_ALT:
+        return flags.generic_alt
+    if error_code in ERROR_CODES_ALIAS_ALT:
+        return flags.alias_alt
+    if error_code in ERROR_CODES_GENERAL_ARGS:
+        return flags.general_args
+    return False
+
+
+def _codes_by_name(error_codes: Iterable[int]) -> Dict[str, Tuple[int, ...]]:
+    """
+    Inverts :data:`BETTER_ALTERNATIVES` for the given error codes.
+
+    :param error_codes: The error codes to include.
+    :return: A dict mapping each full name to the error codes it triggers.
+    """
+    codes_by_name = collections.defaultdict(list)
+    for error_code in sorted(error_codes):
+        for fullname in BETTER_ALTERNATIVES[error_code]:
+            codes_by_name[fullname].append(error_code)
+    return {
+        fullname: tuple(error_codes)
+        for fullname, error_codes in codes_by_name.items()
+    }
+
+
+def may_report(
+    source: str, rules: Rules, project: Optional[ProjectIndex] = None
+) -> bool:
+    """
+    Tells cheaply, without parsing the source code, whether any rule might
+    report an error within it, see :meth:`Rules.may_report`.
+
+    :param source: The source code of a module.
+    :param rules: The active rules.
+    :param project: The index of the project, to also consider aliases re-exported by its modules.
+    :return: False if no rule can report any error in the source code.
+    """
+    return rules.may_report(source) or (
+        project is not None
+        and bool(rules.fullnames)
+        and project.may_report(source, rules.fullnames)
+    )
+
+
+def selected_by(options: argparse.Namespace) -> Callable[[str], bool]:
+    """
+    Uses flake8's own decision process, based on options like ``--select``
+    and ``--ignore``, to tell which error codes are reported at all.
+    """
+    decision_engine = flake8.style_guide.DecisionEngine(options)
+    return (
+        lambda code: decision_engine.decision_for(code)
+        is flake8.style_guide.Decision.Selected
+    )
+
+
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# How many annotations are decoded between two checks of the time budget.
+_DEADLINE_INTERVAL = 64
+
+# The maximum number of distinct annotations in :attr:`Rules.verdicts`.
+VERDICT_MEMO_SIZE = 65536
+
+
+def _annotation_shape(
+    type_hint: ast.expr,
+) -> Tuple[Tuple[Hashable, ...], List[ast.AST]]:
+    """
+    Serializes the structure of an annotation, independent of its position.
+
+    Names are represented by their identifiers, and attributes by their
+    attribute names. Constants are represented by their type only, as they
+    are never decoded. All other nodes are represented by their type and
+    number of children, so that the shape of the tree is unambiguous.
+
+    :param type_hint: The annotation.
+    :return: A pair of the serialized structure, in pre-order, and a list of all names and attributes within the annotation, in the same order.
+    """
+    shape: List[Hashable] = []
+    names: List[ast.AST] = []
+    stack = [type_hint]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Name):
+            shape.append(node.id)
+            names.append(node)
+        elif isinstance(node, ast.Attribute):
+            shape.append("." + node.attr)
+            names.append(node)
+            stack.append(node.value)
+        elif isinstance(node, ast.Constant):
+            shape.append(ast.Constant)
+        elif isinstance(node, ast.Subscript):
+            shape.append(ast.Subscript)
+            stack.append(node.slice)
+            stack.append(node.value)
+        elif isinstance(node, ast.Tuple):
+            shape.append((ast.Tuple, len(node.elts)))
+            stack.extend(reversed(node.elts))
+        else:
+            children = [
+                child
+                for child in ast.iter_child_nodes(node)
+                if not isinstance(child, ast.expr_context)
+            ]
+            shape.append((type(node), len(children)))
+            stack.extend(reversed(children))
+    return tuple(shape), names
+
+
 class Checker:
     """
     A flake8 plugin that checks the use of type alternatives from
@@ -109,9 +424,93 @@ class Checker:
     name = "flake8-typing-collections"
     version = metadata.version(name)
     flags = Flags(False, False, False)
+    rules = compile_rules(flags)
+    cache: Optional[ResultCache] = None
+    stats: Optional[StatsCollector] = None
+    trace: Optional[TraceCollector] = None
+    budget = Budget()
+    project: Optional[ProjectIndex] = None
+    # The changed lines of each file by its absolute path, to only check
+    # these, as set by the command line interface for --tyc_diff.
+    changed_lines: Optional[Dict[str, LineRanges]] = None
+    resolver_backend = ast_import_decode.DEFAULT_BACKEND
 
-    def __init__(self, tree: ast.AST):
+    def __init__(
+        self,
+        tree: ast.AST,
+        lines: Optional[List[str]] = None,
+        filename: Optional[str] = None,
+        *,
+        rules: Optional[Rules] = None,
+        only_lines: Optional[LineRanges] = None,
+    ):
+        """
+        :param tree: The module to check.
+        :param lines: The lines of the module's source code.
+        :param filename: The name of the module's file.
+        :param rules: The rules to check, instead of those of the class.
+        :param only_lines: If given, only the annotations overlapping these lines are checked.
+        """
         self.tree = tree
+        self.lines = lines
+        self.filename = filename
+        if rules is not None:
+            self.rules = rules
+        self.only_lines = only_lines
+        self.candidate_names: FrozenSet[str] = frozenset()
+        self.prefilter_rejections = 0
+        self.decode_calls = 0
+        # Counts the hot paths of the last run, for --tyc_stats and --tyc_trace.
+        self.counters: Dict[str, int] = collections.Counter()
+        self._created_ns = time.time_ns()
+        # The node at which the budget was exceeded, and why.
+        self.budget_exceeded: Optional[Tuple[ast.AST, str]] = None
+        self._deadline: Optional[float] = None
+        self.type_ignore_lines = frozenset(
+            type_ignore.lineno
+            for type_ignore in getattr(tree, "type_ignores", ())
+        )
+        # The first line with a ``# type: ignore`` comment at or after each
+        # line, up to the last such line, so that annotations spanning
+        # several lines are looked up in constant time.
+        self._next_type_ignore_lines: List[int] = []
+        next_line = max(self.type_ignore_lines, default=0)
+        for line in range(next_line, -1, -1):
+            if line in self.type_ignore_lines:
+                next_line = line
+            self._next_type_ignore_lines.append(next_line)
+        self._next_type_ignore_lines.reverse()
+
+    @classmethod
+    def configured(cls, **settings: object) -> Type["Checker"]:
+        """
+        Creates a subclass of the checker with settings of its own. Unlike
+        :meth:`parse_options`, this does not change the settings of other
+        checks in the same process.
+
+        :param settings: The class attributes to set, such as ``rules`` or ``budget``. All other settings keep their defaults.
+        :return: The new subclass.
+        """
+        return type(cls.__name__, (cls,), {**_DEFAULT_SETTINGS, **settings})
+
+    @functools.cached_property
+    def source(self) -> Optional[str]:
+        return None if self.lines is None else "".join(self.lines)
+
+    @functools.cached_property
+    def resolver(self) -> ast_import_decode.ModuleResolver:
+        return ast_import_decode.make_resolver(
+            self.tree, self.resolver_backend, self.source
+        )
+
+    @functools.cached_property
+    def package(self) -> Optional[str]:
+        """The package that relative imports refer to, if known."""
+        return (
+            None
+            if self.project is None
+            else self.project.package_of(self.filename)
+        )
 
     @staticmethod
     def add_options(option_manager: flake8.options.manager.OptionManager):
@@ -130,6 +529,72 @@ class Checker:
             action="store_true",
             help="Activate errors about more general types in function parameters. See README.md for details.",
         )
+        option_manager.add_option(
+            "--tyc_cache_dir",
+            default=None,
+            parse_from_config=True,
+            help="Cache results in this directory and reuse them for unchanged files.",
+        )
+        option_manager.add_option(
+            "--tyc_cache_max_size",
+            type=int,
+            default=100,
+            parse_from_config=True,
+            help="The maximum size of the --tyc_cache_dir directory in megabytes. (Default: %(default)s)",
+        )
+        option_manager.add_option(
+            "--tyc_stats",
+            default=None,
+            metavar="OUTPUT",
+            help="Count and time the hot paths of this plugin and report the statistics of all jobs at exit, to stderr for '-' or else to a JSON file.",
+        )
+        option_manager.add_option(
+            "--tyc_trace",
+            default=None,
+            metavar="OUTPUT",
+            help="Record spans for each file and phase of this plugin and write the traces of all jobs at exit to a JSON file in the Chrome trace-event format.",
+        )
+        option_manager.add_option(
+            "--tyc_max_annotations",
+            type=int,
+            default=None,
+            parse_from_config=True,
+            help="Stop checking a file after this many annotations and report TYC001. (Default: no limit)",
+        )
+        option_manager.add_option(
+            "--tyc_max_depth",
+            type=int,
+            default=None,
+            parse_from_config=True,
+            help="Stop checking a file at annotations with more nested subscripts than this and report TYC001. (Default: no limit)",
+        )
+        option_manager.add_option(
+            "--tyc_max_seconds",
+            type=float,
+            default=None,
+            parse_from_config=True,
+            help="Stop checking a file after this many seconds and report TYC001. (Default: no limit)",
+        )
+        option_manager.add_option(
+            "--tyc_project_index",
+            default=None,
+            metavar="PATH",
+            parse_from_config=True,
+            help="Follow aliases re-exported by the modules of the project, using an index stored in this file. It is created or updated at start.",
+        )
+        option_manager.add_option(
+            "--tyc_project_root",
+            default=".",
+            parse_from_config=True,
+            help="The root directory of the project for --tyc_project_index. (Default: %(default)s)",
+        )
+        option_manager.add_option(
+            "--tyc_resolver",
+            choices=ast_import_decode.BACKENDS,
+            default=ast_import_decode.DEFAULT_BACKEND,
+            parse_from_config=True,
+            help="The backend that finds the scopes of names: 'ast' gives each block of statements its own scope, 'symtable' uses the scopes of Python. (Default: %(default)s)",
+        )
 
     @classmethod
     def parse_options(
@@ -138,19 +603,242 @@ class Checker:
         options: argparse.Namespace,
         extra_args,
     ):
-        cls.flags.generic_alt = options.tyc_generic_alt
-        cls.flags.alias_alt = options.tyc_alias_alt
-        cls.flags.general_args = options.tyc_general_args
+        # A new instance, as the flags might be DEFAULT_FLAGS, which the
+        # in-process API uses as its default.
+        cls.flags = Flags(
+            generic_alt=options.tyc_generic_alt,
+            alias_alt=options.tyc_alias_alt,
+            general_args=options.tyc_general_args,
+        )
         if not any(dataclasses.asdict(cls.flags).values()):
             cls.flags = DEFAULT_FLAGS
+        cls.rules = compile_rules(cls.flags, selected_by(options))
+        if options.tyc_cache_dir is not None:
+            cls.cache = ResultCache(
+                options.tyc_cache_dir, options.tyc_cache_max_size * 1024 * 1024
+            )
+            cls.cache.prune()
+        if options.tyc_stats is not None:
+            cls.stats = StatsCollector(options.tyc_stats)
+        if options.tyc_trace is not None:
+            cls.trace = TraceCollector(options.tyc_trace)
+        cls.budget = Budget(
+            max_annotations=options.tyc_max_annotations,
+            max_depth=options.tyc_max_depth,
+            max_seconds=options.tyc_max_seconds,
+        )
+        if options.tyc_project_index is not None:
+            cls.project = ProjectIndex.load(
+                options.tyc_project_index, options.tyc_project_root
+            )
+        cls.resolver_backend = options.tyc_resolver
 
     def run(self) -> Iterable[Tuple[int, int, str, type]]:
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.AnnAssign):
-                yield from self._check_1xx(node.annotation)
-            elif isinstance(node, ast.FunctionDef):
-                yield from self._check_1xx(node.returns)
-                args = node.args
+        if not self.rules.annotations and not self.rules.arguments:
+            return
+        if self.stats is None and self.trace is None:
+            yield from self._run_cached()
+            return
+        stats = None if self.stats is None else self.stats.current()
+        trace = None if self.trace is None else self.trace.current()
+        start_ns = time.time_ns()
+        results = list(
+            self._run_cached([i for i in (stats, trace) if i is not None])
+        )
+        end_ns = time.time_ns()
+        if stats is not None:
+            stats.count("files")
+            stats.phases["total"] += (end_ns - start_ns) / 1e9
+            stats.counters.update(self.counters)
+            for _, _, message, _ in results:
+                stats.errors[message.split(" ", 1)[0]] += 1
+        if trace is not None:
+            trace.add("handoff", "phase", self._created_ns, start_ns)
+            trace.add(
+                self.filename or "<unknown>",
+                "file",
+                self._created_ns,
+                end_ns,
+                lines=len(self.lines or ()),
+                bytes=len((self.source or "").encode()),
+                errors=len(results),
+                **self.counters,
+            )
+        yield from results
+
+    def _run_cached(
+        self, instruments: Sequence[Union[Stats, Trace]] = ()
+    ) -> Iterable[Tuple[int, int, str, type]]:
+        if self.source is not None and not may_report(
+            self.source, self.rules, self.project
+        ):
+            self.counters["skipped_files"] += 1
+            return
+        # Results for only some lines are not cached, as they are partial.
+        if (
+            self.cache is None
+            or self.source is None
+            or self.only_lines is not None
+        ):
+            yield from self._run(instruments)
+            return
+        key = self._cache_key(self.cache, self.source, self.rules, self.package)
+        cached_results = self.cache.get(
+            key,
+            None if self.project is None else self.project.dependency_digest,
+        )
+        self.counters[
+            "cache_misses" if cached_results is None else "cache_hits"
+        ] += 1
+        if cached_results is None:
+            results = list(self._run(instruments))
+            # Partly checked files are not cached, as the limits may change.
+            if self.budget_exceeded is None:
+                self.cache.put(
+                    key,
+                    (result[:3] for result in results),
+                    self._dependencies(),
+                )
+            yield from results
+        else:
+            for line, col, message in cached_results:
+                yield line, col, message, Checker
+
+    @classmethod
+    def cached_results(
+        cls, source: str, filename: Optional[str]
+    ) -> Optional[List[Tuple[int, int, str]]]:
+        """
+        Looks up the results of a file in the :attr:`cache` without parsing
+        it, for callers that parse files themselves.
+
+        :param source: The source code of the file.
+        :param filename: The name of the file.
+        :return: The cached results as (line, column, message), or None if there are none.
+        """
+        if cls.cache is None:
+            return None
+        package = (
+            None if cls.project is None else cls.project.package_of(filename)
+        )
+        return cls.cache.get(
+            cls._cache_key(cls.cache, source, cls.rules, package),
+            None if cls.project is None else cls.project.dependency_digest,
+        )
+
+    @classmethod
+    def _cache_key(
+        cls,
+        cache: ResultCache,
+        source: str,
+        rules: Rules,
+        package: Optional[str],
+    ) -> str:
+        return cache.key(
+            source.encode(),
+            cls.version,
+            ",".join(map(str, rules.error_codes)),
+            cls.resolver_backend,
+            # The aliases of the project are not part of the key, but stored
+            # as the dependencies of each entry, see :meth:`_dependencies`.
+            *(() if cls.project is None else (package or "",)),
+        )
+
+    def _dependencies(self) -> Optional[Dict[str, str]]:
+        """
+        Finds what the results of the file depend on besides its source
+        code, for storing them in the :attr:`cache`.
+
+        :return: The digests of the aliases of the :attr:`project` that names of the file may resolve through, as in :meth:`ProjectIndex.dependencies`, or None without a project.
+        """
+        if self.project is None:
+            return None
+        aliases = (
+            fullname
+            for table in self.resolver.scope_tables()
+            for fullname in table.values()
+            if fullname is not None
+        )
+        # Modules imported without an alias are not in the tables, as their
+        # names decode to themselves.
+        modules = (
+            alias.name
+            for node in ast.walk(self.tree)
+            if isinstance(node, ast.Import)
+            for alias in node.names
+            if alias.asname is None
+        )
+        return self.project.dependencies(
+            itertools.chain(aliases, modules), self.package
+        )
+
+    def _run(
+        self, instruments: Sequence[Union[Stats, Trace]] = ()
+    ) -> List[Tuple[int, int, str, type]]:
+        """
+        Runs all phases of the checker.
+
+        :param instruments: The statistics and traces of the current process, to time the phases with.
+        :return: The errors, in flake8's format.
+        """
+        timed = (
+            functools.partial(_timed, instruments) if instruments else _untimed
+        )
+        if self.budget.max_seconds is not None:
+            self._deadline = time.perf_counter() + self.budget.max_seconds
+        with timed("index"):
+            self.candidate_names = self._candidate_names()
+        with timed("traversal"):
+            annotation_sites = list(self._annotation_sites())
+        with timed("decode"):
+            decoded_names = self._decode(annotation_sites)
+        with timed("matching"):
+            results = list(self._match(decoded_names))
+        self.counters.update(
+            annotation_sites=len(annotation_sites),
+            decode_calls=self.decode_calls,
+            prefilter_rejections=self.prefilter_rejections,
+            alias_tables_built=self.resolver.tables_built,
+        )
+        if self.budget_exceeded is not None:
+            self.counters["budget_exceeded"] += 1
+        if self.budget_exceeded is not None and self.rules.reports_budget:
+            node, reason = self.budget_exceeded
+            results.append(
+                (
+                    node.lineno,
+                    node.col_offset,
+                    f"{BUDGET_ERROR_CODE} File only partly checked: {reason}.",
+                    Checker,
+                )
+            )
+        return results
+
+    def _annotation_sites(
+        self,
+    ) -> Iterable[Tuple[ast.expr, bool, ast.stmt]]:
+        """
+        Finds all annotations within the tree, except for those carrying
+        a ``# type: ignore`` comment or outside of :attr:`only_lines`.
+
+        Only statements are visited, the expressions of ordinary code are
+        never descended into. If there are more annotations than the budget
+        allows, :attr:`budget_exceeded` is set and the iteration stops.
+
+        :return: An iteration over triples of an annotation, whether it annotates a function argument, and the statement containing it.
+        """
+        max_annotations = self.budget.max_annotations
+        count = 0
+        for statement in self.resolver.blocks():
+            if self.only_lines is not None and not self._in_only_lines(
+                statement
+            ):
+                continue
+            if isinstance(statement, ast.AnnAssign):
+                annotations = [(statement.annotation, False)]
+            elif isinstance(statement, _FUNCTION_TYPES):
+                annotations = [(statement.returns, False)]
+                args = statement.args
                 for arg in itertools.chain(
                     args.args,
                     args.posonlyargs,
@@ -158,64 +846,417 @@ class Checker:
                     [args.vararg, args.kwarg],
                 ):
                     if arg is not None:
-                        yield from self._check_1xx(arg.annotation)
-                        yield from self._check_2xx(arg.annotation)
+                        annotations.append((arg.annotation, True))
+            else:
+                continue
+            for type_hint, is_argument in annotations:
+                if (
+                    type_hint is not None
+                    and not self._is_type_ignored(type_hint)
+                    and (
+                        self.only_lines is None
+                        or self._in_only_lines(type_hint)
+                    )
+                ):
+                    count += 1
+                    if max_annotations is not None and count > max_annotations:
+                        self.budget_exceeded = (
+                            type_hint,
+                            f"more than {max_annotations} annotations",
+                        )
+                        return
+                    yield type_hint, is_argument, statement
 
-    def _check_1xx(
-        self, type_hint: Optional[ast.expr]
-    ) -> Iterable[Tuple[int, int, str, type]]:
-        if type_hint is None or any(
-            type_hint.lineno == type_ignore.lineno
-            for type_ignore in self.tree.type_ignores
-        ):
-            return []
-        for error_code in range(100, 133):
-            for ancestor in ast.walk(type_hint):
-                yield from self._use_better_alternative(ancestor, error_code)
+    def _candidate_names(self) -> FrozenSet[str]:
+        """
+        Finds all names that may decode to a name triggering an active error.
 
-    def _check_2xx(
-        self, type_hint: Optional[ast.expr]
-    ) -> Iterable[Tuple[int, int, str, type]]:
-        if type_hint is None or any(
-            type_hint.lineno == type_ignore.lineno
-            for type_ignore in self.tree.type_ignores
-        ):
-            return []
-        yield from self._use_better_alternative(type_hint, 200)
-        yield from self._use_better_alternative(type_hint, 201)
-        yield from self._use_better_alternative(type_hint, 202)
+        Decoding only ever replaces a prefix of a name, so the last segment
+        of a name stays the same unless the whole name is an alias. Names
+        whose last segment is in the returned set are candidates, all others
+        can be rejected without decoding them.
 
-    def _use_better_alternative(
-        self, type_hint: ast.AST, error_code: int
-    ) -> Iterable[Tuple[int, int, str, type]]:
-        if error_code in ERROR_CODES_GENERIC_ALT and not self.flags.generic_alt:
-            return []
-        if error_code in ERROR_CODES_ALIAS_ALT and not self.flags.alias_alt:
-            return []
-        if (
-            error_code in ERROR_CODES_GENERAL_ARGS
-            and not self.flags.general_args
-        ):
-            return []
+        With a :attr:`project` index, aliases re-exported by the project's
+        modules are followed, so their last segments are candidates, too.
+        With :attr:`only_lines`, only the blocks overlapping them are
+        considered, as no other block encloses a checked annotation.
+        """
+        fullnames = self.rules.fullnames
+        within = None if self.only_lines is None else self._in_only_lines
+        if self.project is None:
+            return self.rules.terminal_names | frozenset(
+                alias.rsplit(".", 1)[-1]
+                for table in self.resolver.scope_tables(within)
+                for alias, fullname in table.items()
+                if fullname in fullnames
+            )
+        return (
+            self.rules.terminal_names
+            | self.project.trigger_names(fullnames)
+            | frozenset(
+                alias.rsplit(".", 1)[-1]
+                for table in self.resolver.scope_tables(within)
+                for alias, fullname in table.items()
+                if fullname is not None
+                and self.project.resolve(fullname, self.package) in fullnames
+            )
+        )
+
+    def _in_only_lines(self, node: ast.AST) -> bool:
+        """
+        Tells whether a node overlaps :attr:`only_lines`. Nodes without
+        a position, such as the module itself, always do.
+        """
+        lineno = getattr(node, "lineno", None)
+        if lineno is None:
+            return True
+        end_lineno = getattr(node, "end_lineno", None) or lineno
+        return self.only_lines.overlaps(lineno, end_lineno)
+
+    def _is_type_ignored(self, type_hint: ast.expr) -> bool:
+        """
+        Tells whether any line spanned by the annotation carries
+        a ``# type: ignore`` comment.
+        """
+        if type_hint.lineno >= len(self._next_type_ignore_lines):
+            return False
+        end_lineno = getattr(type_hint, "end_lineno", None) or type_hint.lineno
+        return self._next_type_ignore_lines[type_hint.lineno] <= end_lineno
+
+    def _decode(
+        self, annotation_sites: Iterable[Tuple[ast.expr, bool, ast.stmt]]
+    ) -> List[Tuple[ast.AST, str, bool]]:
+        """
+        Decodes all names within the given annotations that might trigger
+        an active error code.
 
-        while isinstance(type_hint, ast.Subscript):
-            type_hint = type_hint.value
+        Every name within an annotation is decoded once, unless it is not
+        one of the :attr:`candidate_names`. Only the outermost name of
+        function argument annotations is relevant for TYC2xx codes; if no
+        TYC1xx code is active, the other names are not decoded at all.
+        Otherwise, the results are memoized, see :meth:`_decode_memoized`.
 
-        if isinstance(type_hint, ast.Name) or isinstance(
-            type_hint, ast.Attribute
+        If an annotation is nested deeper than the budget allows, or the
+        time budget is used up, :attr:`budget_exceeded` is set and the names
+        decoded so far are returned.
+
+        :param annotation_sites: The annotations, as returned by :meth:`_annotation_sites`.
+        :return: A list of triples of a name, its decoded full name, and whether it is the outermost name of a function argument annotation.
+        """
+        decoded_names = []
+        # The budget may already be exceeded by the number of annotations.
+        exceeded_before = self.budget_exceeded
+        memo = None
+        if self.rules.annotations and self.budget.max_depth is None:
+            memo = self.rules.verdicts
+        for i, (type_hint, is_argument, statement) in enumerate(
+            annotation_sites
         ):
             if (
-                ast_import_decode.decode(self.tree, type_hint)
-                in BETTER_ALTERNATIVES[error_code]
+                self._deadline is not None
+                and i % _DEADLINE_INTERVAL == 0
+                and time.perf_counter() > self._deadline
             ):
+                self.budget_exceeded = (
+                    type_hint,
+                    f"more than {self.budget.max_seconds} seconds",
+                )
+                break
+            outermost = None
+            if is_argument and self.rules.arguments:
+                outermost = type_hint
+                while isinstance(outermost, ast.Subscript):
+                    outermost = outermost.value
+            if memo is not None:
+                decoded_names.extend(
+                    self._decode_memoized(memo, type_hint, outermost, statement)
+                )
+                continue
+            if self.rules.annotations:
+                nodes = self._walk_limited(type_hint, self.budget.max_depth)
+            else:
+                nodes = [outermost] if outermost is not None else []
+            for node in nodes:
+                fullname = self._decode_name(node, statement)
+                if fullname is not None:
+                    decoded_names.append((node, fullname, node is outermost))
+            if self.budget_exceeded is not exceeded_before:
+                break
+        return decoded_names
+
+    def _decode_memoized(
+        self,
+        memo: LRUMemo,
+        type_hint: ast.expr,
+        outermost: Optional[ast.expr],
+        statement: ast.stmt,
+    ) -> List[Tuple[ast.AST, str, bool]]:
+        """
+        Decodes the names within an annotation that trigger an active rule.
+
+        Which names trigger a rule only depends on the shape of the annotation
+        and on the aliases in scope, including those of the :attr:`project`,
+        so the result is memoized under these, across files. Names are stored
+        by their position within the shape, and mapped back to the nodes of
+        the current annotation.
+
+        :param memo: The memo to use, which must belong to the current rules.
+        :param type_hint: The annotation.
+        :param outermost: The outermost name of the annotation if it annotates a function argument and TYC2xx codes are active, None otherwise.
+        :param statement: The statement containing the annotation.
+        :return: The names triggering a rule, as in :meth:`_decode`.
+        """
+        shape, names = _annotation_shape(type_hint)
+        key = (
+            shape,
+            outermost is not None,
+            self.resolver.scope_fingerprint(statement),
+        )
+        if self.project is not None:
+            key += (self.project.fingerprint, self.package)
+        verdict = memo.get(key)
+        if verdict is None:
+            fullnames = self.rules.fullnames
+            verdict = []
+            for i, node in enumerate(names):
+                fullname = self._decode_name(node, statement)
+                if fullname in fullnames:
+                    verdict.append((i, fullname, node is outermost))
+            verdict = tuple(verdict)
+            memo.put(key, verdict)
+            self.counters["verdict_misses"] += 1
+        else:
+            self.counters["verdict_hits"] += 1
+        return [
+            (names[i], fullname, is_outermost)
+            for i, fullname, is_outermost in verdict
+        ]
+
+    def _decode_name(self, node: ast.AST, statement: ast.stmt) -> Optional[str]:
+        """
+        Decodes a node if it is a name and one of the :attr:`candidate_names`,
+        following aliases of the :attr:`project` if there is an index.
+
+        :return: The full name, or None if the node is not decoded.
+        """
+        if isinstance(node, ast.Name):
+            terminal_name = node.id
+        elif isinstance(node, ast.Attribute):
+            terminal_name = node.attr
+        else:
+            return None
+        if terminal_name not in self.candidate_names:
+            self.prefilter_rejections += 1
+            return None
+        self.decode_calls += 1
+        fullname = self.resolver.decode(node, statement)
+        if self.project is not None:
+            fullname = self.project.resolve(fullname, self.package)
+        return fullname
+
+    def _walk_limited(
+        self, type_hint: ast.expr, max_depth: Optional[int]
+    ) -> Iterable[ast.AST]:
+        """
+        Iterates over all nodes within an annotation, like :func:`ast.walk`,
+        unless it has more than ``max_depth`` nested subscripts. In that case,
+        :attr:`budget_exceeded` is set and the iteration stops there.
+        """
+        if max_depth is None:
+            yield from ast.walk(type_hint)
+            return
+        stack = [(type_hint, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if isinstance(node, ast.Subscript):
+                depth += 1
+                if depth > max_depth:
+                    self.budget_exceeded = (
+                        node,
+                        f"annotation nested deeper than {max_depth} subscripts",
+                    )
+                    return
+            yield node
+            stack.extend(
+                (child, depth)
+                for child in reversed(list(ast.iter_child_nodes(node)))
+            )
+
+    def _match(
+        self, decoded_names: Iterable[Tuple[ast.AST, str, bool]]
+    ) -> Iterable[Tuple[int, int, str, type]]:
+        """
+        Looks up the decoded names in the active rules.
+
+        :param decoded_names: The decoded names, as returned by :meth:`_decode`.
+        :return: An iteration over the errors, in flake8's format.
+        """
+        for node, fullname, is_outermost_argument in decoded_names:
+            error_codes = self.rules.annotations.get(fullname, ())
+            if is_outermost_argument:
+                error_codes += self.rules.arguments.get(fullname, ())
+            for error_code in error_codes:
                 yield (
-                    type_hint.lineno,
-                    type_hint.col_offset,
+                    node.lineno,
+                    node.col_offset,
                     f"TYC{error_code} " + ERROR_MESSAGES[error_code],
                     Checker,
                 )
 
 
+# The settings of :class:`Checker` before :meth:`Checker.parse_options` sets
+# any, see :meth:`Checker.configured`.
+_DEFAULT_SETTINGS = {
+    name: getattr(Checker, name)
+    for name in (
+        "rules",
+        "cache",
+        "stats",
+        "trace",
+        "budget",
+        "project",
+        "changed_lines",
+        "resolver_backend",
+    )
+}
+
+
+def _untimed(phase: str) -> ContextManager[None]:
+    return contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def _timed(
+    instruments: Sequence[Union[Stats, Trace]], phase: str
+) -> Iterator[None]:
+    with contextlib.ExitStack() as stack:
+        for instrument in instruments:
+            stack.enter_context(instrument.timed(phase))
+        yield
+
+
+@dataclasses.dataclass(frozen=True)
+class Violation:
+    """
+    A single error found by :func:`check_tree` or :func:`check_source`.
+
+    :ivar line: The line of the offending name, starting at 1.
+    :ivar col: The column of the offending name, starting at 0.
+    :ivar code: The error code, such as ``"TYC100"``.
+    :ivar message: The description of the error, without the code.
+    """
+
+    line: int
+    col: int
+    code: str
+    message: str
+
+
+def check_tree(
+    tree: ast.AST,
+    flags: Flags = DEFAULT_FLAGS,
+    *,
+    budget: Budget = Budget(),
+    resolver_backend: str = ast_import_decode.DEFAULT_BACKEND,
+) -> List[Violation]:
+    """
+    Checks an already parsed module, without going through flake8.
+
+    The settings of flake8 or of the command line interface do not apply,
+    even within the same process.
+
+    :param tree: The module to check.
+    :param flags: The flags that activate groups of error codes.
+    :param budget: The limits on the work spent on the module.
+    :param resolver_backend: The backend that finds the scopes of names, one of :data:`ast_import_decode.BACKENDS`.
+    :return: The errors found, sorted by their position.
+    :raises: The ``symtable`` backend needs the source code on Python 3.8, so a :class:`ValueError` is raised there. Use :func:`check_source` instead.
+    """
+    return _check(tree, None, flags, budget, resolver_backend)
+
+
+def _check(
+    tree: ast.AST,
+    lines: Optional[List[str]],
+    flags: Flags,
+    budget: Budget,
+    resolver_backend: str,
+) -> List[Violation]:
+    checker_class = configured_checker(
+        flags, budget=budget, resolver_backend=resolver_backend
+    )
+    checker = checker_class(tree, lines)
+    violations = []
+    for line, col, text, _ in checker.run():
+        code, message = text.split(" ", 1)
+        violations.append(Violation(line, col, code, message))
+    return sorted(violations, key=lambda v: (v.line, v.col, v.code))
+
+
+def check_source(
+    source: str,
+    flags: Flags = DEFAULT_FLAGS,
+    *,
+    budget: Budget = Budget(),
+    resolver_backend: str = ast_import_decode.DEFAULT_BACKEND,
+) -> List[Violation]:
+    """
+    Checks the source code of a module, without going through flake8.
+
+    :param source: The source code to check.
+    :param flags: The flags that activate groups of error codes.
+    :param budget: The limits on the work spent on the module.
+    :param resolver_backend: The backend that finds the scopes of names, as for :func:`check_tree`.
+    :return: The errors found, sorted by their position.
+    :raises: If the source code cannot be parsed, a :class:`SyntaxError` is raised.
+    """
+    return _check(
+        ast.parse(source),
+        source.splitlines(keepends=True),
+        flags,
+        budget,
+        resolver_backend,
+    )
+
+
+def configured_checker(
+    flags: Flags = DEFAULT_FLAGS,
+    *,
+    budget: Budget = Budget(),
+    resolver_backend: str = ast_import_decode.DEFAULT_BACKEND,
+) -> Type[Checker]:
+    """
+    Finds the checker class for checking modules in-process, as created by
+    :meth:`Checker.configured`. Classes are reused for the same settings,
+    which keeps the cost of each call low.
+
+    :param flags: The flags that activate groups of error codes.
+    :param budget: The limits on the work spent on each module.
+    :param resolver_backend: The backend that finds the scopes of names, one of :data:`ast_import_decode.BACKENDS`.
+    :return: A subclass of :class:`Checker` with these settings.
+    """
+    return _configured_checker(
+        dataclasses.astuple(flags), budget, resolver_backend
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_rules(*flags: bool) -> Rules:
+    return compile_rules(Flags(*flags))
+
+
+@functools.lru_cache(maxsize=128)
+def _configured_checker(
+    flags: Tuple[bool, ...], budget: Budget, resolver_backend: str
+) -> Type[Checker]:
+    return Checker.configured(
+        flags=Flags(*flags),
+        rules=_compile_rules(*flags),
+        budget=budget,
+        resolver_backend=resolver_backend,
+    )
+
+
 ERROR_MESSAGES = {
     100: "Use typing.Iterable instead of collections.abc.Iterable in type annotations.",
     101: "Use typing.Iterator instead of collections.abc.Iterator in type annotations.",
@@ -0,0 +1,428 @@
+"""
+Runs the checks of this plugin without flake8.
+
+Going through flake8 means paying for its option parsing and all other
+installed plugins. This command line interface only runs the checks of
+this plugin, distributing the files over several processes, and reports
+the errors in flake8's default format::
+
+    python -m flake8_typing_collections [--tyc_generic_alt] [paths ...]
+"""
+
+import argparse
+import ast
+import concurrent.futures
+import contextlib
+import dataclasses
+import fnmatch
+import functools
+import importlib.util
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import flake8.defaults
+
+from flake8_typing_collections import ast_import_decode, diff
+from flake8_typing_collections.cache import ResultCache
+from flake8_typing_collections.checker import (
+    DEFAULT_FLAGS,
+    Budget,
+    Checker,
+    Flags,
+    selected_by,
+    compile_rules,
+    may_report,
+)
+from flake8_typing_collections.project import ProjectIndex
+from flake8_typing_collections.stats import StatsCollector
+from flake8_typing_collections.tracing import TraceCollector
+
+# A single reported error, as (filename, line, column, message).
+Report = Tuple[str, int, int, str]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the command line interface.
+
+    :param argv: The command line arguments, excluding the program name. Defaults to :data:`sys.argv`.
+    :return: The exit code, which is 1 if any errors were reported and 0 otherwise.
+    """
+    options = _parser().parse_args(argv)
+    settings = _settings(options)
+    filenames = list(discover(options.paths, options.exclude))
+    if options.tyc_diff is not None:
+        try:
+            changed_lines = diff.changed_lines(options.tyc_diff)
+        except (OSError, subprocess.CalledProcessError) as e:
+            message = getattr(e, "stderr", None) or e
+            print(
+                f"{_parser().prog}: git diff failed: {message}", file=sys.stderr
+            )
+            return 2
+        # Unchanged files are not even read.
+        filenames = [
+            filename
+            for filename in filenames
+            if changed_lines.get(os.path.abspath(filename))
+        ]
+        settings["changed_lines"] = changed_lines
+    batches = [
+        filenames[i : i + options.batch_size]
+        for i in range(0, len(filenames), options.batch_size)
+    ]
+    found_errors = False
+    for reports in _run_batches(batches, settings, options.jobs):
+        for filename, line, col, message in reports:
+            print(f"{filename}:{line}:{col + 1}: {message}")
+            found_errors = True
+        sys.stdout.flush()
+    for collector in (settings["stats"], settings["trace"]):
+        if collector is not None:
+            collector.report()
+    return 1 if found_errors else 0
+
+
+def _settings(options: argparse.Namespace) -> Dict[str, object]:
+    """
+    :return: The class attributes of the checker, as set by :func:`_init_worker` in worker processes and passed to :meth:`Checker.configured` otherwise.
+    """
+    flags = Flags(
+        generic_alt=options.tyc_generic_alt,
+        alias_alt=options.tyc_alias_alt,
+        general_args=options.tyc_general_args,
+    )
+    if not any(dataclasses.asdict(flags).values()):
+        flags = DEFAULT_FLAGS
+    rules = compile_rules(flags, selected_by(options))
+    cache = None
+    if options.tyc_cache_dir is not None:
+        cache = ResultCache(
+            options.tyc_cache_dir, options.tyc_cache_max_size * 1024 * 1024
+        )
+        cache.prune()
+    stats = None
+    if options.tyc_stats is not None:
+        stats = StatsCollector(options.tyc_stats)
+    trace = None
+    if options.tyc_trace is not None:
+        trace = TraceCollector(options.tyc_trace)
+    project = None
+    if options.tyc_project_index is not None:
+        project = ProjectIndex.load(
+            options.tyc_project_index, options.tyc_project_root, options.jobs
+        )
+    return dict(
+        rules=rules,
+        cache=cache,
+        stats=stats,
+        trace=trace,
+        budget=Budget(
+            max_annotations=options.tyc_max_annotations,
+            max_depth=options.tyc_max_depth,
+            max_seconds=options.tyc_max_seconds,
+        ),
+        project=project,
+        resolver_backend=options.tyc_resolver,
+        # Set by :func:`main` for --tyc_diff.
+        changed_lines=None,
+    )
+
+
+def discover(paths: Iterable[str], exclude: Sequence[str]) -> Iterable[str]:
+    """
+    Finds all files to check.
+
+    Files that are given explicitly are always checked. Directories are
+    searched recursively for Python files.
+
+    :param paths: The files and directories to check.
+    :param exclude: Glob patterns of files and directories to skip, matched against both their names and their paths.
+    :return: An iteration over the files to check.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, filenames in os.walk(path):
+            subdirectories[:] = sorted(
+                subdirectory
+                for subdirectory in subdirectories
+                if not _is_excluded(
+                    os.path.join(directory, subdirectory), exclude
+                )
+            )
+            for filename in sorted(filenames):
+                filename = os.path.join(directory, filename)
+                if filename.endswith(".py") and not _is_excluded(
+                    filename, exclude
+                ):
+                    yield filename
+
+
+def check_files(
+    filenames: Iterable[str], checker_class: Type[Checker] = Checker
+) -> List[Report]:
+    """
+    Checks files with the rules, cache, budget and instrumentation that are
+    set on the checker class.
+
+    :param filenames: The files to check.
+    :param checker_class: :class:`Checker` or a subclass created by :meth:`Checker.configured`, whose settings to check with.
+    :return: The reported errors, sorted by file, line and column.
+    """
+    reports = []
+    for filename in filenames:
+        try:
+            with open(filename, "rb") as f:
+                source = importlib.util.decode_source(f.read())
+        except SyntaxError:
+            # Syntax errors are left to flake8, see :func:`check_buffer`.
+            continue
+        except (OSError, UnicodeDecodeError) as e:
+            reports.append((filename, 1, 0, f"E902 {type(e).__name__}: {e}"))
+            continue
+        reports.extend(check_buffer(filename, source, checker_class))
+    return reports
+
+
+def check_buffer(
+    filename: str, source: str, checker_class: Type[Checker] = Checker
+) -> List[Report]:
+    """
+    Checks the source code of a file, like :func:`check_files`.
+
+    :param filename: The name to report the errors with.
+    :param source: The source code of the file, which need not be saved.
+    :param checker_class: The checker class whose settings to check with, as for :func:`check_files`.
+    :return: The reported errors, sorted by line and column.
+    """
+    only_lines = None
+    changed_lines = checker_class.changed_lines
+    if changed_lines is not None:
+        only_lines = changed_lines.get(os.path.abspath(filename))
+        if not only_lines:
+            return []
+    stats = (
+        None if checker_class.stats is None else checker_class.stats.current()
+    )
+    trace = (
+        None if checker_class.trace is None else checker_class.trace.current()
+    )
+    if not may_report(source, checker_class.rules, checker_class.project):
+        # Files without any error are not even parsed.
+        if stats is not None:
+            stats.count("files")
+            stats.count("skipped_files")
+        return []
+    cached_results = (
+        None
+        if only_lines is not None
+        else checker_class.cached_results(source, filename)
+    )
+    if cached_results is not None:
+        # Files with cached results are not parsed either.
+        if stats is not None:
+            stats.count("files")
+            stats.count("cache_hits")
+        return sorted(
+            (filename, line, col, message)
+            for line, col, message in cached_results
+        )
+    parsing = (
+        contextlib.nullcontext()
+        if trace is None
+        else trace.span("parse", filename=filename)
+    )
+    try:
+        with parsing:
+            tree = ast.parse(source, filename)
+    except SyntaxError:
+        # Syntax errors are left to flake8, which reports them as E999. They
+        # could not be reported consistently anyway, as files without
+        # candidates or with cached results are not parsed.
+        return []
+    checker = checker_class(
+        tree, source.splitlines(keepends=True), filename, only_lines=only_lines
+    )
+    return sorted(
+        (filename, line, col, message)
+        for line, col, message, _ in checker.run()
+    )
+
+
+def _run_batches(
+    batches: Sequence[Sequence[str]],
+    settings: Dict[str, object],
+    jobs: int,
+) -> Iterable[List[Report]]:
+    """
+    Checks batches of files, in worker processes if there is more than one
+    job, and yields the reports of each batch as soon as it is finished.
+    The settings are set as class attributes of :class:`Checker` within the
+    worker processes, and of a subclass of it within the current process.
+    """
+    if jobs <= 1 or len(batches) <= 1:
+        checker_class = Checker.configured(**settings)
+        yield from map(
+            functools.partial(check_files, checker_class=checker_class),
+            batches,
+        )
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(settings,),
+    ) as executor:
+        futures = [executor.submit(check_files, batch) for batch in batches]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def _init_worker(settings: Dict[str, object]) -> None:
+    for name, value in settings.items():
+        setattr(Checker, name, value)
+
+
+def _is_excluded(path: str, exclude: Sequence[str]) -> bool:
+    name = os.path.basename(path)
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern)
+        for pattern in exclude
+    )
+
+
+def _comma_separated(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_typing_collections",
+        description="Checks the use of type alternatives from the typing module, without running flake8.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=["."],
+        help="The files and directories to check. (Default: the current directory)",
+    )
+    parser.add_argument(
+        "--tyc_generic_alt",
+        action="store_true",
+        help="Activate errors about generic type versions. See README.md for details.",
+    )
+    parser.add_argument(
+        "--tyc_alias_alt",
+        action="store_true",
+        help="Activate errors about alias type versions. See README.md for details.",
+    )
+    parser.add_argument(
+        "--tyc_general_args",
+        action="store_true",
+        help="Activate errors about more general types in function parameters. See README.md for details.",
+    )
+    parser.add_argument(
+        "--select",
+        type=_comma_separated,
+        default=None,
+        help="Comma-separated list of error codes to report, like flake8's --select.",
+    )
+    parser.add_argument(
+        "--ignore",
+        type=_comma_separated,
+        default=None,
+        help="Comma-separated list of error codes not to report, like flake8's --ignore.",
+    )
+    parser.add_argument(
+        "--exclude",
+        type=_comma_separated,
+        default=list(flake8.defaults.EXCLUDE),
+        help="Comma-separated list of glob patterns of files and directories to skip. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of worker processes. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=16,
+        help="The number of files that are sent to a worker process at once. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tyc_cache_dir",
+        default=None,
+        help="Cache results in this directory and reuse them for unchanged files.",
+    )
+    parser.add_argument(
+        "--tyc_cache_max_size",
+        type=int,
+        default=100,
+        help="The maximum size of the --tyc_cache_dir directory in megabytes. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tyc_stats",
+        default=None,
+        metavar="OUTPUT",
+        help="Count and time the hot paths and report the statistics of all jobs at exit, to stderr for '-' or else to a JSON file.",
+    )
+    parser.add_argument(
+        "--tyc_trace",
+        default=None,
+        metavar="OUTPUT",
+        help="Record spans for each file and phase and write the traces of all jobs at exit to a JSON file in the Chrome trace-event format.",
+    )
+    parser.add_argument(
+        "--tyc_max_annotations",
+        type=int,
+        default=None,
+        help="Stop checking a file after this many annotations and report TYC001. (Default: no limit)",
+    )
+    parser.add_argument(
+        "--tyc_max_depth",
+        type=int,
+        default=None,
+        help="Stop checking a file at annotations with more nested subscripts than this and report TYC001. (Default: no limit)",
+    )
+    parser.add_argument(
+        "--tyc_max_seconds",
+        type=float,
+        default=None,
+        help="Stop checking a file after this many seconds and report TYC001. (Default: no limit)",
+    )
+    parser.add_argument(
+        "--tyc_project_index",
+        default=None,
+        metavar="PATH",
+        help="Follow aliases re-exported by the modules of the project, using an index stored in this file. It is created or updated at start.",
+    )
+    parser.add_argument(
+        "--tyc_project_root",
+        default=".",
+        help="The root directory of the project for --tyc_project_index. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tyc_resolver",
+        choices=ast_import_decode.BACKENDS,
+        default=ast_import_decode.DEFAULT_BACKEND,
+        help="The backend that finds the scopes of names: 'ast' gives each block of statements its own scope, 'symtable' uses the scopes of Python. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tyc_diff",
+        default=None,
+        metavar="BASE",
+        help="Only check the annotations on lines that changed since this git revision, such as origin/main, skipping unchanged files.",
+    )
+    parser.set_defaults(
+        extend_select=None,
+        extend_ignore=None,
+        extended_default_select=["TYC"],
+        extended_default_ignore=[],
+    )
+    return parser
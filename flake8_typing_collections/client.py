@@ -0,0 +1,126 @@
+"""
+Sends files to a running :mod:`.daemon` to check them::
+
+    python -m flake8_typing_collections.client --socket PATH [options] [paths ...]
+
+The client takes the same options as the command line interface and
+prints the errors in the same format. It only imports the standard
+library, so that it starts quickly. If no daemon is listening on the
+socket, or the daemon was started with options that give different
+results, the client checks the files itself instead.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# A single reported error, as (filename, line, column, message).
+Report = Tuple[str, int, int, str]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the client.
+
+    :param argv: The command line arguments, excluding the program name. Defaults to :data:`sys.argv`.
+    :return: The exit code, which is 1 if any errors were reported and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_typing_collections.client",
+        description="Checks files with a running flake8_typing_collections.daemon. All options but --socket are those of python -m flake8_typing_collections.",
+    )
+    parser.add_argument(
+        "--socket",
+        required=True,
+        help="The path of the Unix domain socket that the daemon listens on.",
+    )
+    options, cli_argv = parser.parse_known_args(argv)
+    reports = request(options.socket, cli_argv)
+    if reports is None:
+        from flake8_typing_collections import cli
+
+        return cli.main(cli_argv)
+    for filename, line, col, message in reports:
+        print(f"{filename}:{line}:{col + 1}: {message}")
+    return 1 if reports else 0
+
+
+def check(
+    socket_path: str, argv: Sequence[str], sources: Dict[str, str]
+) -> List[Report]:
+    """
+    Checks source code that need not be saved, such as the buffers of an
+    editor, with the daemon if possible and in-process otherwise.
+
+    :param socket_path: The path of the Unix domain socket that the daemon listens on.
+    :param argv: The options of the command line interface, without paths.
+    :param sources: The source code to check, by the file name to report errors with.
+    :return: The reported errors.
+    """
+    reports = request(socket_path, argv, sources)
+    if reports is not None:
+        return reports
+    from flake8_typing_collections import cli
+
+    settings = cli._settings(cli._parser().parse_args(argv))
+    checker_class = cli.Checker.configured(**settings)
+    reports = []
+    for filename, source in sources.items():
+        reports.extend(cli.check_buffer(filename, source, checker_class))
+    return reports
+
+
+def request(
+    socket_path: str,
+    argv: Sequence[str],
+    sources: Optional[Dict[str, str]] = None,
+) -> Optional[List[Report]]:
+    """
+    Sends a single request to the daemon.
+
+    :param socket_path: The path of the Unix domain socket that the daemon listens on.
+    :param argv: The command line arguments of the command line interface.
+    :param sources: Source code to check instead of the paths within the arguments, by file name.
+    :return: The reported errors, or None if the daemon is not running or cannot check the files with these options.
+    """
+    message = {"argv": list(argv), "cwd": os.getcwd()}
+    if sources:
+        message["sources"] = sources
+    response = _send(socket_path, message)
+    if response is None:
+        return None
+    if "error" in response:
+        print(
+            f"flake8_typing_collections.client: {response['error']} Checking without the daemon.",
+            file=sys.stderr,
+        )
+        return None
+    return [tuple(report) for report in response["reports"]]
+
+
+def shutdown(socket_path: str) -> bool:
+    """
+    Asks the daemon to exit.
+
+    :return: Whether a daemon was running.
+    """
+    return _send(socket_path, {"shutdown": True}) is not None
+
+
+def _send(socket_path: str, message: dict) -> Optional[dict]:
+    try:
+        with socket.socket(socket.AF_UNIX) as s:
+            s.connect(socket_path)
+            s.sendall(json.dumps(message).encode() + b"\n")
+            with s.makefile("rb") as f:
+                response = f.readline()
+        return json.loads(response)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Checks files for clients in a long-running process.
+
+Every run of flake8 or of the command line interface pays for starting
+Python and importing flake8, and starts with cold caches. The daemon pays
+for this once and then checks files for any number of requests, keeping
+the verdicts of annotations, the module-level alias tables, the project
+index and the results of recently checked files in memory::
+
+    python -m flake8_typing_collections.daemon --socket PATH [options]
+
+It takes the same options as the command line interface, except for the
+paths. Requests are sent by :mod:`.client` over a Unix domain socket, one
+request per connection: a line of JSON with the command line arguments
+and working directory of the client, and optionally source code that is
+not saved yet. The daemon answers with a line of JSON holding the reports,
+or an error if the client's options would give different results than
+its own, in which case the client checks the files itself.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from flake8_typing_collections import cli, diff
+from flake8_typing_collections.cache import MemoryCache
+from flake8_typing_collections.checker import Checker
+
+# The number of results of checked files that are kept in memory.
+MEMORY_CACHE_SIZE = 4096
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the daemon until it is interrupted or asked to shut down.
+
+    :param argv: The command line arguments, excluding the program name. Defaults to :data:`sys.argv`.
+    :return: The exit code.
+    """
+    parser = cli._parser()
+    parser.prog = "python -m flake8_typing_collections.daemon"
+    parser.description = (
+        "Checks files for flake8_typing_collections.client in the background."
+    )
+    parser.add_argument(
+        "--socket",
+        required=True,
+        help="The path of the Unix domain socket to listen on.",
+    )
+    options = parser.parse_args(argv)
+    try:
+        serve(options.socket, options)
+    except OSError as e:
+        print(f"{parser.prog}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def serve(socket_path: str, options: argparse.Namespace) -> None:
+    """
+    Checks files for clients until a client asks the daemon to shut down.
+
+    :param socket_path: The path of the Unix domain socket to listen on. A stale socket of a daemon that did not shut down cleanly is replaced.
+    :param options: The options of the command line interface to check files with.
+    :raises: If another daemon is listening on the socket already, a :class:`FileExistsError` is raised.
+    """
+    # Requests change the working directory to the client's.
+    for name in ("tyc_cache_dir", "tyc_project_index", "tyc_project_root"):
+        if getattr(options, name) is not None:
+            setattr(options, name, os.path.abspath(getattr(options, name)))
+    for name in ("tyc_stats", "tyc_trace"):
+        if getattr(options, name) not in (None, "-"):
+            setattr(options, name, os.path.abspath(getattr(options, name)))
+    settings = cli._settings(options)
+    settings["cache"] = MemoryCache(MEMORY_CACHE_SIZE, settings["cache"])
+    _remove_stale_socket(socket_path)
+    with _Server(socket_path, _Handler) as server:
+        server.checker_class = Checker.configured(**settings)
+        server.project_index = options.tyc_project_index
+        server.key = _result_key(options, os.getcwd())
+        try:
+            while not server.stopping:
+                server.handle_request()
+        finally:
+            os.remove(socket_path)
+
+
+class _Server(socketserver.UnixStreamServer):
+    checker_class: Type[Checker]
+    project_index: Optional[str]
+    # The options that the results depend on, see :func:`_result_key`.
+    key: Tuple
+    stopping = False
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self._respond(request)
+        except (ValueError, TypeError, KeyError) as e:
+            response = {"error": f"Invalid request: {e}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    def _respond(self, request: dict) -> dict:
+        if request.get("shutdown"):
+            self.server.stopping = True
+            return {"reports": []}
+        parser = cli._parser()
+        try:
+            options = parser.parse_args(request["argv"])
+        except SystemExit:
+            return {"error": "Invalid arguments."}
+        cwd = request["cwd"]
+        if _result_key(options, cwd) != self.server.key:
+            return {"error": "The daemon was started with other options."}
+        os.chdir(cwd)
+        checker_class = self.server.checker_class
+        project = checker_class.project
+        if project is not None and project.update(jobs=1):
+            project.save(self.server.project_index)
+        # The diff is computed for every request, as the working tree may
+        # have changed since the last one.
+        checker_class.changed_lines = None
+        if options.tyc_diff is not None:
+            try:
+                checker_class.changed_lines = diff.changed_lines(
+                    options.tyc_diff
+                )
+            except (OSError, subprocess.CalledProcessError) as e:
+                return {"error": f"git diff failed: {e}"}
+        sources: Dict[str, str] = request.get("sources") or {}
+        if sources:
+            reports: List[cli.Report] = []
+            for filename, source in sources.items():
+                reports.extend(
+                    cli.check_buffer(filename, source, checker_class)
+                )
+        else:
+            filenames = cli.discover(options.paths, options.exclude)
+            if checker_class.changed_lines is not None:
+                filenames = [
+                    filename
+                    for filename in filenames
+                    if checker_class.changed_lines.get(
+                        os.path.abspath(filename)
+                    )
+                ]
+            reports = cli.check_files(filenames, checker_class)
+        return {"reports": reports}
+
+
+def _result_key(options: argparse.Namespace, cwd: str) -> Tuple:
+    """
+    :param options: The options of the command line interface.
+    :param cwd: The directory that relative paths within the options refer to.
+    :return: All options that the reported errors depend on.
+    """
+    project_index = options.tyc_project_index
+    return (
+        options.tyc_generic_alt,
+        options.tyc_alias_alt,
+        options.tyc_general_args,
+        options.select,
+        options.ignore,
+        options.tyc_max_annotations,
+        options.tyc_max_depth,
+        options.tyc_max_seconds,
+        options.tyc_resolver,
+        (
+            None
+            if project_index is None
+            else os.path.normpath(os.path.join(cwd, project_index))
+        ),
+        (
+            None
+            if project_index is None
+            else os.path.normpath(os.path.join(cwd, options.tyc_project_root))
+        ),
+    )
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX) as s:
+        try:
+            s.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+            return
+    raise FileExistsError(f"A daemon is running on {socket_path} already.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
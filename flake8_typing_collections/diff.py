@@ -0,0 +1,101 @@
+"""
+Finds the lines changed relative to a git revision.
+
+On pull requests, only errors on changed lines are of interest. The
+command line interface uses :func:`changed_lines` to skip unchanged files
+and to only check the annotations that overlap a changed line.
+"""
+
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+from flake8_typing_collections.checker import LineRanges
+
+_FILE_HEADER = re.compile(r"^\+\+\+ (?:b/(.*)|/dev/null)$")
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def changed_lines(
+    base: str, cwd: Optional[str] = None
+) -> Dict[str, LineRanges]:
+    """
+    Finds the lines that changed in the working tree since a revision.
+
+    :param base: The revision to compare with, such as ``origin/main``.
+    :param cwd: A directory within the repository. Defaults to the current directory.
+    :return: The changed lines of each changed file, by its absolute path. Deleted files are not included.
+    :raises: If git fails, a :class:`subprocess.CalledProcessError` or an :class:`OSError` is raised.
+    """
+    root = _git(["rev-parse", "--show-toplevel"], cwd).strip()
+    diff = _git(
+        [
+            "-c",
+            "core.quotePath=false",
+            "diff",
+            "--unified=0",
+            "--no-color",
+            "--no-ext-diff",
+            base,
+            "--",
+        ],
+        cwd,
+    )
+    return parse_diff(diff, root)
+
+
+def parse_diff(diff: str, root: str) -> Dict[str, LineRanges]:
+    """
+    Parses the output of ``git diff --unified=0``.
+
+    Hunks that only delete lines mark the lines before and after the
+    deletion as changed, as a multi-line annotation spanning them might
+    have changed.
+
+    :param diff: The output of git.
+    :param root: The root directory of the repository.
+    :return: The changed lines of each changed file, by its absolute path.
+    """
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    current: Optional[List[Tuple[int, int]]] = None
+    # Whether the lines are within the header of a file, before its first
+    # hunk. Within hunks, an added line such as ``++ b/x`` looks like a
+    # file header.
+    in_header = False
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            in_header = True
+            continue
+        match = _FILE_HEADER.match(line) if in_header else None
+        if match is not None:
+            if match[1] is None:
+                current = None
+            else:
+                path = os.path.normpath(os.path.join(root, match[1]))
+                current = ranges.setdefault(path, [])
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match is not None:
+            in_header = False
+        if match is not None and current is not None:
+            first = int(match[1])
+            count = 1 if match[2] is None else int(match[2])
+            if count:
+                current.append((first, first + count - 1))
+            else:
+                current.append((first, first + 1))
+    return {
+        path: LineRanges(path_ranges) for path, path_ranges in ranges.items()
+    }
+
+
+def _git(args: List[str], cwd: Optional[str]) -> str:
+    return subprocess.run(
+        ["git"] + args,
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
@@ -0,0 +1,213 @@
+"""
+Re-checks a module after an edit, reusing the results of unchanged parts.
+
+Editors check a module again after every change, although most of it is
+usually unchanged. :func:`check_incrementally` splits a module into
+segments, one for each top-level statement and each statement directly
+within a top-level class, so that every method is a segment of its own.
+The results of each segment are stored in a :class:`Snapshot`, keyed by
+the source code of the segment and the aliases visible to it. When the
+module is checked again with the previous snapshot, only the segments
+without a stored key are checked, and the stored results of all others
+are moved to their new line numbers.
+
+Neither computing the keys nor checking the changed segments visits the
+unchanged functions: both work on a copy of the module that only contains
+the statements defining module-level and class-level aliases, and the
+changed segments.
+"""
+
+import ast
+import bisect
+import collections
+import copy
+import dataclasses
+import hashlib
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+
+from flake8_typing_collections import ast_import_decode
+from flake8_typing_collections.checker import (
+    DEFAULT_FLAGS,
+    Budget,
+    Checker,
+    Flags,
+    LineRanges,
+    Violation,
+    configured_checker,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Segment:
+    """
+    The results of a single segment of a module.
+
+    :ivar key: A digest of the source code of the segment and of the aliases visible to it.
+    :ivar results: The errors within the segment, as (line, column, message), with lines counted from the first line of the segment.
+    """
+
+    key: bytes
+    results: Tuple[Tuple[int, int, str], ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class Snapshot:
+    """
+    The results of :func:`check_incrementally` for a version of a module.
+
+    :ivar error_codes: The error codes that were active.
+    :ivar segments: The results of each segment of the module.
+    :ivar rechecked: The number of segments that were checked, rather than reused from the previous snapshot.
+    """
+
+    error_codes: Tuple[int, ...]
+    segments: Tuple[Segment, ...]
+    rechecked: int
+
+
+def check_incrementally(
+    source: str,
+    previous: Optional[Snapshot] = None,
+    flags: Flags = DEFAULT_FLAGS,
+    filename: Optional[str] = None,
+    tree: Optional[ast.AST] = None,
+    *,
+    budget: Budget = Budget(),
+    resolver_backend: str = ast_import_decode.DEFAULT_BACKEND,
+) -> Tuple[List[Violation], Snapshot]:
+    """
+    Checks the source code of a module, like :func:`checker.check_source`,
+    reusing the results of all segments that did not change since the
+    previous snapshot.
+
+    :param source: The source code to check.
+    :param previous: The snapshot returned for an earlier version of the module, if any.
+    :param flags: The flags that activate groups of error codes.
+    :param filename: The name of the module's file.
+    :param tree: The source code, already parsed. By default, it is parsed here.
+    :param budget: The limits on the work spent on the module.
+    :param resolver_backend: The backend that finds the scopes of names, as for :func:`checker.check_tree`.
+    :return: The errors found, sorted by their position, and the snapshot to pass for the next version.
+    :raises: If the source code cannot be parsed, a :class:`SyntaxError` is raised.
+    """
+    if tree is None:
+        tree = ast.parse(source)
+    checker_class = configured_checker(
+        flags, budget=budget, resolver_backend=resolver_backend
+    )
+    rules = checker_class.rules
+    lines = source.splitlines(keepends=True)
+    skeletons: Dict[ast.AST, ast.AST] = {}
+    checker = checker_class(_skeleton(tree, (), skeletons), lines, filename)
+
+    reusable: Dict[bytes, List[Segment]] = collections.defaultdict(list)
+    if previous is not None and previous.error_codes == rules.error_codes:
+        for segment in previous.segments:
+            reusable[segment.key].append(segment)
+    firsts = []
+    keys = []
+    results: List[List[Tuple[int, int, str]]] = []
+    changed = []
+    changed_statements = set()
+    for statement, block in _segments(tree):
+        first = min(
+            [statement.lineno]
+            + [d.lineno for d in getattr(statement, "decorator_list", ())]
+        )
+        last = statement.end_lineno or statement.lineno
+        key = _segment_key(checker, lines[first - 1 : last], skeletons[block])
+        candidates = reusable.get(key)
+        firsts.append(first)
+        keys.append(key)
+        if candidates:
+            results.append(list(candidates.pop(0).results))
+        else:
+            results.append([])
+            changed.append((first, last))
+            changed_statements.add(statement)
+
+    if changed:
+        checker = checker_class(
+            _skeleton(tree, changed_statements, {}),
+            lines,
+            filename,
+            # Statements defining aliases, such as try blocks, are part of
+            # the skeleton even if they are unchanged.
+            only_lines=LineRanges(changed),
+        )
+        for line, col, message, _ in checker.run():
+            i = bisect.bisect_right(firsts, line) - 1
+            results[i].append((line - firsts[i], col, message))
+    violations = []
+    for first, segment_results in zip(firsts, results):
+        for line, col, text in segment_results:
+            code, message = text.split(" ", 1)
+            violations.append(Violation(first + line, col, code, message))
+    violations.sort(key=lambda v: (v.line, v.col, v.code))
+
+    if checker.budget_exceeded is not None:
+        # Segments after the limit were not checked at all.
+        segments: Sequence[Segment] = ()
+    else:
+        segments = [
+            Segment(key, tuple(segment_results))
+            for key, segment_results in zip(keys, results)
+        ]
+    return violations, Snapshot(
+        rules.error_codes, tuple(segments), len(changed)
+    )
+
+
+def _segments(tree: ast.AST) -> List[Tuple[ast.stmt, ast.AST]]:
+    """
+    :return: The statements of all segments of a module, and the block containing each.
+    """
+    segments = []
+    for statement in getattr(tree, "body", ()):
+        if isinstance(statement, ast.ClassDef):
+            segments.extend(_segments(statement))
+        else:
+            segments.append((statement, tree))
+    return segments
+
+
+def _skeleton(
+    block: ast.AST,
+    changed: Collection[ast.stmt],
+    skeletons: Dict[ast.AST, ast.AST],
+) -> ast.AST:
+    """
+    Copies a module or class, keeping only the statements that define its
+    aliases, the changed segments, and the skeletons of nested classes.
+    The alias tables of the copy are the same as those of the original.
+
+    :param block: The module or class to copy.
+    :param changed: The statements of the changed segments.
+    :param skeletons: Maps each copied block to its copy. The copies of the given block and all nested classes are added.
+    :return: The copy.
+    """
+    body = []
+    for statement in block.body:
+        if isinstance(statement, ast.ClassDef):
+            body.append(_skeleton(statement, changed, skeletons))
+        elif statement in changed or isinstance(statement, _ALIAS_TYPES):
+            body.append(statement)
+    skeleton = copy.copy(block)
+    skeleton.body = body
+    skeletons[block] = skeleton
+    return skeleton
+
+
+# Statements that contribute to the alias table of the block containing them.
+_ALIAS_TYPES = ast_import_decode._RELEVANT_TYPES + (ast.Try,)
+
+
+def _segment_key(checker: Checker, lines: List[str], block: ast.AST) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("".join(lines).encode())
+    digest.update(checker.resolver_backend.encode())
+    digest.update(checker.resolver.scope_fingerprint(block))
+    if checker.project is not None:
+        digest.update(checker.project.fingerprint)
+        digest.update((checker.package or "").encode())
+    return digest.digest()
@@ -0,0 +1,766 @@
+"""
+Resolves names that are re-exported by the modules of a project.
+
+Decoding a name only looks at the file that contains it. If a project
+defines ``Seq = collections.abc.Sequence`` in one module and imports
+``Seq`` from there in others, the name decodes to the module's own name,
+such as ``myproject.compat.Seq``. The :class:`ProjectIndex` records the
+module-level aliases of all modules of a project, so that such names can
+be followed to the full name they refer to.
+
+The index is stored in a JSON file. When it is loaded, only the modules
+that changed since are scanned again. The aliases are also written to a
+binary :class:`AliasTable` next to it, which is memory-mapped for lookups,
+so that all processes of a run share a single copy through the page cache.
+
+Results of files that import from the project depend on the aliases of
+other modules. :meth:`ProjectIndex.dependencies` finds digests of the
+aliases that a file may follow, so that cached results are only reused
+while the modules they were found with, and the modules these import from
+in turn, are unchanged.
+"""
+
+import ast
+import bisect
+import concurrent.futures
+import fnmatch
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import flake8.defaults
+
+from flake8_typing_collections import ast_import_decode
+
+# Stored index files of other versions are rebuilt from scratch.
+_FORMAT = 1
+
+# Scanning fewer modules than this is not worth starting worker processes.
+_PARALLEL_THRESHOLD = 64
+
+# Following aliases stops after this many steps, in case of cycles.
+_MAX_RESOLUTION_STEPS = 16
+
+# The layout of an :class:`AliasTable`. All integers are little-endian.
+_TABLE_MAGIC = b"TYCA"
+# magic, format, number of strings, number of buckets, number of entries,
+# fingerprint
+_TABLE_HEADER = struct.Struct("<4sIIII16s")
+# hash, module, alias, target; all but the hash are indices of strings
+_TABLE_ENTRY = struct.Struct("<IIII")
+_OFFSET = struct.Struct("<I")
+# The target of aliases that are defined ambiguously.
+_NO_TARGET = 0xFFFFFFFF
+
+
+class AliasTable:
+    """
+    A read-only hash table of the aliases of all modules of a project, in
+    a compact binary layout that is looked up without deserializing it.
+
+    The layout consists of a header, the offsets of all strings within the
+    string table, the offsets of all buckets within the entries, the
+    entries, and the string table holding all module names, aliases and
+    targets in UTF-8. Entries are sorted into buckets by the CRC-32 of their
+    module name and alias, which is stable across processes and runs. Each
+    module with aliases also has an entry with an empty alias, so that
+    modules can be told apart from other prefixes of a name.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        """
+        :param buffer: The table, as built by :meth:`build`.
+        :raises: If the buffer is not a table of the current format, a :class:`ValueError` is raised.
+        """
+        try:
+            magic, version, n_strings, n_buckets, n_entries, fingerprint = (
+                _TABLE_HEADER.unpack_from(buffer, 0)
+            )
+        except struct.error as e:
+            raise ValueError("Not an alias table.") from e
+        if magic != _TABLE_MAGIC or version != _FORMAT:
+            raise ValueError("Not an alias table of the current format.")
+        self.fingerprint: bytes = fingerprint
+        self._buffer = buffer
+        self._n_entries = n_entries
+        self._mask = n_buckets - 1
+        self._strings_at = _TABLE_HEADER.size
+        self._buckets_at = self._strings_at + _OFFSET.size * (n_strings + 1)
+        self._entries_at = self._buckets_at + _OFFSET.size * (n_buckets + 1)
+        self._blob_at = self._entries_at + _TABLE_ENTRY.size * n_entries
+
+    @classmethod
+    def open(cls, path: str) -> "AliasTable":
+        """
+        Memory-maps a table from a file.
+
+        :raises: If the file cannot be read, an :class:`OSError` is raised. If it is not a table, a :class:`ValueError` is raised.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    @staticmethod
+    def build(
+        aliases: Dict[str, Dict[str, Optional[str]]], fingerprint: bytes
+    ) -> bytes:
+        """
+        :param aliases: The aliases of each module, mapping to their full names or to None if ambiguous.
+        :param fingerprint: A digest of the aliases, 16 bytes long.
+        :return: The table.
+        """
+        strings: Dict[str, int] = {}
+
+        def intern(string: str) -> int:
+            return strings.setdefault(string, len(strings))
+
+        entries = []
+        for module, module_aliases in aliases.items():
+            for alias, target in itertools.chain(
+                [("", module)], module_aliases.items()
+            ):
+                entries.append(
+                    (
+                        _hash(module, alias),
+                        intern(module),
+                        intern(alias),
+                        _NO_TARGET if target is None else intern(target),
+                    )
+                )
+        n_buckets = 1
+        while n_buckets * 2 <= len(entries):
+            n_buckets *= 2
+        mask = n_buckets - 1
+        entries.sort(key=lambda entry: (entry[0] & mask, entry))
+        bucket_offsets = [0] * (n_buckets + 1)
+        for entry in entries:
+            bucket_offsets[(entry[0] & mask) + 1] += 1
+        for i in range(n_buckets):
+            bucket_offsets[i + 1] += bucket_offsets[i]
+
+        encoded = [string.encode() for string in strings]
+        string_offsets = [0]
+        for string in encoded:
+            string_offsets.append(string_offsets[-1] + len(string))
+        return b"".join(
+            [
+                _TABLE_HEADER.pack(
+                    _TABLE_MAGIC,
+                    _FORMAT,
+                    len(strings),
+                    n_buckets,
+                    len(entries),
+                    fingerprint,
+                ),
+                struct.pack(f"<{len(string_offsets)}I", *string_offsets),
+                struct.pack(f"<{len(bucket_offsets)}I", *bucket_offsets),
+                *(_TABLE_ENTRY.pack(*entry) for entry in entries),
+                *encoded,
+            ]
+        )
+
+    def has_module(self, module: str) -> bool:
+        """Tells whether a module has any aliases."""
+        return self._find(module, "") is not None
+
+    def get(self, module: str, alias: str) -> Optional[str]:
+        """
+        :return: The full name of an alias of a module, or None if the alias is unknown or ambiguous.
+        """
+        entry = self._find(module, alias)
+        if entry is None or entry[3] == _NO_TARGET:
+            return None
+        return self._string(entry[3])
+
+    def items(self) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        :return: An iteration over triples of a module, an alias, and its full name or None.
+        """
+        for i in range(self._n_entries):
+            _, module, alias, target = _TABLE_ENTRY.unpack_from(
+                self._buffer, self._entries_at + _TABLE_ENTRY.size * i
+            )
+            alias = self._string(alias)
+            if alias:
+                yield (
+                    self._string(module),
+                    alias,
+                    None if target == _NO_TARGET else self._string(target),
+                )
+
+    def _find(
+        self, module: str, alias: str
+    ) -> Optional[Tuple[int, int, int, int]]:
+        hash_ = _hash(module, alias)
+        bucket = hash_ & self._mask
+        start, end = struct.unpack_from(
+            "<II", self._buffer, self._buckets_at + _OFFSET.size * bucket
+        )
+        module_bytes = alias_bytes = None
+        for i in range(start, end):
+            entry = _TABLE_ENTRY.unpack_from(
+                self._buffer, self._entries_at + _TABLE_ENTRY.size * i
+            )
+            if entry[0] != hash_:
+                continue
+            if module_bytes is None:
+                module_bytes, alias_bytes = module.encode(), alias.encode()
+            if (
+                self._string_bytes(entry[1]) == module_bytes
+                and self._string_bytes(entry[2]) == alias_bytes
+            ):
+                return entry
+        return None
+
+    def _string_bytes(self, index: int) -> bytes:
+        start, end = struct.unpack_from(
+            "<II", self._buffer, self._strings_at + _OFFSET.size * index
+        )
+        return self._buffer[self._blob_at + start : self._blob_at + end]
+
+    def _string(self, index: int) -> str:
+        return self._string_bytes(index).decode()
+
+
+def _hash(module: str, alias: str) -> int:
+    return zlib.crc32(f"{module}\0{alias}".encode())
+
+
+class ProjectIndex:
+    """
+    The module-level aliases of all modules within a project directory.
+
+    Modules are named by their path relative to the project root, so
+    ``root/pkg/mod.py`` is ``pkg.mod`` and ``root/pkg/__init__.py`` is
+    ``pkg``. Aliases of relative imports are stored as absolute names.
+    """
+
+    def __init__(self, root: str):
+        """
+        :param root: The project root directory.
+        """
+        self.root = os.path.abspath(root)
+        # Maps each module to a dict of "path", "mtime_ns", "size", "sha256",
+        # "is_package" and "aliases".
+        self.modules: Dict[str, dict] = {}
+        self._table = AliasTable(AliasTable.build({}, bytes(16)))
+        # The file the table is memory-mapped from, if any.
+        self._table_path: Optional[str] = None
+        # Memoizes :meth:`resolve`, as each lookup in the table is a search.
+        self._resolved: Dict[str, str] = {}
+        self._trigger_names: Dict[FrozenSet[str], FrozenSet[str]] = {}
+        self._patterns: Dict[FrozenSet[str], "re.Pattern[str]"] = {}
+        # The aliases of each module as sorted (alias, full name) pairs, and
+        # the sorted module names, read from the table when first needed.
+        self._module_aliases: Optional[
+            Dict[str, List[Tuple[str, Optional[str]]]]
+        ] = None
+        self._module_names: List[str] = []
+        # Memoizes :meth:`dependency_digest`.
+        self._dependency_digests: Dict[str, str] = {}
+
+    def __getstate__(self) -> dict:
+        if self._table_path is None:
+            return self.__dict__
+        # Other processes map the table themselves.
+        return dict(
+            self.__dict__,
+            modules={},
+            _table=None,
+            _module_aliases=None,
+            _module_names=[],
+            _dependency_digests={},
+        )
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self._table is None:
+            self._table = AliasTable.open(self._table_path)
+
+    @property
+    def fingerprint(self) -> bytes:
+        """A digest of all aliases in the index."""
+        return self._table.fingerprint
+
+    @classmethod
+    def load(
+        cls, path: str, root: str, jobs: Optional[int] = None
+    ) -> "ProjectIndex":
+        """
+        Loads an index from a file and updates it to the current state of the
+        project, scanning only new and changed modules. The updated index is
+        written back to the file, and its aliases are memory-mapped from the
+        table next to it.
+
+        :param path: The file to store the index in. It need not exist.
+        :param root: The project root directory.
+        :param jobs: The number of processes to scan modules with. Defaults to the number of CPUs.
+        :return: The updated index.
+        """
+        index = cls(root)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if (
+                stored.get("format") == _FORMAT
+                and stored.get("python") == list(sys.version_info[:2])
+                and stored.get("root") == index.root
+            ):
+                index.modules = stored["modules"]
+                index._index_aliases()
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+        table_path = _table_path(path)
+        if index.update(jobs) or not index._map_table(table_path):
+            index.save(path)
+            index._map_table(table_path)
+        return index
+
+    def update(self, jobs: Optional[int] = None) -> bool:
+        """
+        Scans all new and changed modules and forgets deleted ones.
+
+        Modules are considered unchanged if their modification time and size
+        are unchanged, or else if their content hash is unchanged.
+
+        :param jobs: The number of processes to scan modules with. Defaults to the number of CPUs.
+        :return: Whether the index changed.
+        """
+        changed = False
+        modules = {}
+        to_scan = []
+        for path in _python_files(self.root):
+            name, is_package = _module_name(os.path.relpath(path, self.root))
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = self.modules.get(name)
+            if (
+                entry is not None
+                and entry["path"] == path
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["size"] == stat.st_size
+            ):
+                modules[name] = entry
+                continue
+            changed = True
+            to_scan.append((name, is_package, path, stat, entry))
+        changed = changed or modules.keys() != self.modules.keys()
+
+        hashed = []
+        for name, is_package, path, stat, entry in to_scan:
+            try:
+                with open(path, "rb") as f:
+                    sha256 = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                continue
+            new_entry = dict(
+                path=path,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                sha256=sha256,
+                is_package=is_package,
+                aliases=None,
+            )
+            if entry is not None and entry["sha256"] == sha256:
+                new_entry["aliases"] = entry["aliases"]
+            else:
+                hashed.append((name, path, is_package))
+            modules[name] = new_entry
+
+        paths = [path for _, path, _ in hashed]
+        packages = [
+            _package(name, is_package) for name, _, is_package in hashed
+        ]
+        if len(hashed) >= _PARALLEL_THRESHOLD and (jobs is None or jobs > 1):
+            with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+                aliases = list(
+                    executor.map(scan_module, paths, packages, chunksize=16)
+                )
+        else:
+            aliases = list(map(scan_module, paths, packages))
+        for (name, _, _), module_aliases in zip(hashed, aliases):
+            modules[name]["aliases"] = module_aliases
+
+        if changed:
+            self.modules = modules
+            self._index_aliases()
+        return changed
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to a file and its :class:`AliasTable` next to it,
+        atomically replacing them.
+
+        :param path: The file to store the index in.
+        """
+        _write_atomically(
+            _table_path(path),
+            AliasTable.build(self._aliases(), self.fingerprint),
+        )
+        _write_atomically(
+            path,
+            json.dumps(
+                {
+                    "format": _FORMAT,
+                    "python": list(sys.version_info[:2]),
+                    "root": self.root,
+                    "modules": self.modules,
+                }
+            ).encode(),
+        )
+
+    def package_of(self, filename: Optional[str]) -> Optional[str]:
+        """
+        Finds the package that relative imports within a file refer to.
+
+        :param filename: The path of a file.
+        :return: The package, or None if the file is not within the project.
+        """
+        if filename is None:
+            return None
+        path = os.path.relpath(os.path.abspath(filename), self.root)
+        if path.startswith(os.pardir) or not path.endswith(".py"):
+            return None
+        return _package(*_module_name(path))
+
+    def resolve(self, fullname: str, package: Optional[str] = None) -> str:
+        """
+        Follows a decoded name through the aliases of the project's modules.
+
+        :param fullname: A name as returned by :func:`ast_import_decode.decode`.
+        :param package: The package of the file the name was decoded in, for names of relative imports.
+        :return: The full name that the name refers to.
+        """
+        if fullname.startswith("."):
+            if package is None:
+                return fullname
+            fullname = _absolute(fullname, package) or fullname
+        resolved = self._resolved.get(fullname)
+        if resolved is None:
+            resolved = self._resolved[fullname] = self._resolve(fullname)
+        return resolved
+
+    def _resolve(self, fullname: str) -> str:
+        for _ in range(_MAX_RESOLUTION_STEPS):
+            parts = fullname.split(".")
+            for i in range(len(parts) - 1, 0, -1):
+                module = ".".join(parts[:i])
+                if self._table.has_module(module):
+                    break
+            else:
+                return fullname
+            target = self._table.get(module, parts[i])
+            if target is None or target == fullname:
+                return fullname
+            fullname = ".".join([target] + parts[i + 1 :])
+        return fullname
+
+    def trigger_names(self, fullnames: FrozenSet[str]) -> FrozenSet[str]:
+        """
+        Finds the last segments of all module-level aliases that resolve to
+        one of the given full names.
+
+        :param fullnames: The full names to look for.
+        :return: The names, as used for :attr:`Checker.candidate_names`.
+        """
+        names = self._trigger_names.get(fullnames)
+        if names is None:
+            names = frozenset(
+                alias.rsplit(".", 1)[-1]
+                for _, alias in self._exports(fullnames)
+            )
+            self._trigger_names[fullnames] = names
+        return names
+
+    def may_report(self, source: str, fullnames: FrozenSet[str]) -> bool:
+        """
+        Tells cheaply whether a source code might import any alias of the
+        project that resolves to one of the given full names, like
+        :meth:`Rules.may_report`.
+
+        :param source: The source code of a module.
+        :param fullnames: The full names to look for.
+        :return: False if the source code cannot refer to such an alias.
+        """
+        pattern = self._patterns.get(fullnames)
+        if pattern is None:
+            first_segments = sorted(
+                {
+                    module.split(".", 1)[0]
+                    for module, _ in self._exports(fullnames)
+                }
+            )
+            if first_segments:
+                # Relative imports do not mention the top-level package.
+                pattern = re.compile(
+                    r"\bfrom\s*\.|\b(?:{})\b".format(
+                        "|".join(map(re.escape, first_segments))
+                    )
+                )
+            else:
+                pattern = re.compile(r"(?!)")
+            self._patterns[fullnames] = pattern
+        return pattern.search(source) is not None
+
+    def dependencies(
+        self, fullnames: Iterable[str], package: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Finds what the resolution of names depends on, for storing it with
+        results that were found by resolving them.
+
+        :param fullnames: The full names of all aliases within a file, as in the tables of :class:`ast_import_decode.ModuleResolver`, and of all modules it imports without an alias. Every name that the file decodes starts with one of these, unless it is not imported at all.
+        :param package: The package of the file, for names of relative imports.
+        :return: The :meth:`dependency_digest` of each name, made absolute.
+        """
+        names = set()
+        for fullname in fullnames:
+            if fullname.startswith("."):
+                if package is None:
+                    # Such names are not resolved either.
+                    continue
+                fullname = _absolute(fullname, package) or fullname
+            names.add(fullname)
+        return {name: self.dependency_digest(name) for name in sorted(names)}
+
+    def dependency_digest(self, fullname: str) -> str:
+        """
+        Computes a digest of the aliases of all modules that resolving a
+        name, or an attribute of it, may look at: the modules that contain
+        the name or are contained in it, and, transitively, the modules that
+        the aliases of these modules refer to. The digest only changes if
+        the aliases of one of these modules change, or if such a module is
+        added or removed.
+
+        :param fullname: An absolute full name.
+        :return: The digest as a hex string.
+        """
+        digest = self._dependency_digests.get(fullname)
+        if digest is not None:
+            return digest
+        if self._module_aliases is None:
+            self._module_aliases = {}
+            for module, alias, target in self._table.items():
+                self._module_aliases.setdefault(module, []).append(
+                    (alias, target)
+                )
+            for module_aliases in self._module_aliases.values():
+                module_aliases.sort()
+            self._module_names = sorted(self._module_aliases)
+        modules = set()
+        names = [fullname]
+        while names:
+            name = names.pop()
+            for module in self._related_modules(name):
+                if module not in modules:
+                    modules.add(module)
+                    names.extend(
+                        target
+                        for _, target in self._module_aliases[module]
+                        if target is not None
+                    )
+        hash_ = hashlib.blake2b(digest_size=8)
+        for module in sorted(modules):
+            hash_.update(
+                json.dumps([module, self._module_aliases[module]]).encode()
+            )
+        digest = self._dependency_digests[fullname] = hash_.hexdigest()
+        return digest
+
+    def _related_modules(self, fullname: str) -> Iterator[str]:
+        """
+        :return: An iteration over the modules with aliases that contain a name or are contained in it, including the name itself.
+        """
+        parts = fullname.split(".")
+        for i in range(1, len(parts)):
+            module = ".".join(parts[:i])
+            if self._table.has_module(module):
+                yield module
+        prefix = fullname + "."
+        for module in itertools.islice(
+            self._module_names,
+            bisect.bisect_left(self._module_names, fullname),
+            None,
+        ):
+            if module != fullname and not module.startswith(prefix):
+                break
+            yield module
+
+    def _exports(self, fullnames: FrozenSet[str]) -> Iterable[Tuple[str, str]]:
+        for module, alias, _ in self._table.items():
+            if self.resolve(f"{module}.{alias}") in fullnames:
+                yield module, alias
+
+    def _map_table(self, path: str) -> bool:
+        """
+        Replaces the table with the one stored in a file, if it holds the
+        same aliases.
+
+        :return: Whether the table was replaced.
+        """
+        try:
+            table = AliasTable.open(path)
+        except (OSError, ValueError):
+            return False
+        if table.fingerprint != self.fingerprint:
+            return False
+        self._table = table
+        self._table_path = path
+        return True
+
+    def _aliases(self) -> Dict[str, Dict[str, Optional[str]]]:
+        return {
+            name: entry["aliases"]
+            for name, entry in self.modules.items()
+            if entry["aliases"]
+        }
+
+    def _index_aliases(self) -> None:
+        aliases = self._aliases()
+        fingerprint = hashlib.blake2b(
+            json.dumps(aliases, sort_keys=True).encode(), digest_size=16
+        ).digest()
+        self._table = AliasTable(AliasTable.build(aliases, fingerprint))
+        self._table_path = None
+        self._resolved.clear()
+        self._trigger_names.clear()
+        self._patterns.clear()
+        self._module_aliases = None
+        self._module_names = []
+        self._dependency_digests.clear()
+
+
+def scan_module(path: str, package: str) -> Dict[str, Optional[str]]:
+    """
+    Finds the module-level aliases of a module.
+
+    Besides the aliases found by :class:`ast_import_decode.ModuleResolver`,
+    modules imported without an alias are included as aliases of themselves,
+    so that their attributes can be followed. Names of relative imports
+    are made absolute, and values of assign statements are decoded.
+
+    :param path: The path of the module.
+    :param package: The package that relative imports within the module refer to.
+    :return: A dict mapping aliases to full names, or to None if ambiguous. Modules that cannot be read or parsed have no aliases.
+    """
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return {}
+    scope_chain = ast_import_decode.ModuleResolver(tree).scope_chain(tree)
+    table = dict(scope_chain[0]) if scope_chain else {}
+    for statement in tree.body:
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname is None:
+                    first_segment = alias.name.split(".", 1)[0]
+                    table.setdefault(first_segment, first_segment)
+    aliases = {}
+    for alias, fullname in table.items():
+        if fullname is not None:
+            fullname = _decode_value(table, alias, fullname)
+            if fullname.startswith("."):
+                fullname = _absolute(fullname, package)
+        aliases[alias] = fullname
+    return aliases
+
+
+def _decode_value(
+    table: Dict[str, Optional[str]], alias: str, fullname: str
+) -> str:
+    """
+    Decodes the value of an assign statement, like ``Seq = cabc.Sequence``,
+    through the other aliases of the same module.
+    """
+    parts = fullname.split(".")
+    for i in range(len(parts) - 1, 0, -1):
+        prefix = ".".join(parts[:i])
+        if prefix != alias and table.get(prefix) not in (None, prefix):
+            return ".".join([table[prefix]] + parts[i:])
+    return fullname
+
+
+def _absolute(fullname: str, package: str) -> Optional[str]:
+    """
+    Makes the name of a relative import absolute.
+
+    :param fullname: A name starting with one dot per level, like ``..mod.X``.
+    :param package: The package that the import is relative to.
+    :return: The absolute name, or None if it would be beyond the top-level package.
+    """
+    name = fullname.lstrip(".")
+    level = len(fullname) - len(name)
+    parts = package.split(".") if package else []
+    if level > len(parts):
+        return None
+    base = parts[: len(parts) - (level - 1)]
+    return ".".join(base + ([name] if name else []))
+
+
+def _table_path(path: str) -> str:
+    return path + ".table"
+
+
+def _write_atomically(path: str, content: bytes) -> None:
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            f.write(content)
+        os.replace(temporary_path, path)
+    except OSError:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+
+
+def _module_name(path: str) -> Tuple[str, bool]:
+    """
+    :param path: The path of a module relative to the project root.
+    :return: The name of the module, and whether it is a package.
+    """
+    parts = path[: -len(".py")].split(os.sep)
+    if parts[-1] == "__init__":
+        return ".".join(parts[:-1]), True
+    return ".".join(parts), False
+
+
+def _package(module: str, is_package: bool) -> str:
+    return module if is_package else module.rpartition(".")[0]
+
+
+def _python_files(root: str) -> Iterable[str]:
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories[:] = sorted(
+            subdirectory
+            for subdirectory in subdirectories
+            if subdirectory.isidentifier()
+            and not _is_excluded(subdirectory, flake8.defaults.EXCLUDE)
+        )
+        for filename in sorted(filenames):
+            if filename.endswith(".py") and filename[:-3].isidentifier():
+                yield os.path.join(directory, filename)
+
+
+def _is_excluded(name: str, exclude: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in exclude)
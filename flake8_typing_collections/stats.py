@@ -0,0 +1,217 @@
+"""
+Counts and times the hot paths of the checker.
+
+flake8 checks files in several worker processes when ``--jobs`` is used,
+so the statistics are collected per process. Worker processes write their
+statistics to a spool directory when they exit, and the process that
+enabled the statistics merges them with its own when it exits itself.
+The :class:`Collector` implementing this is shared with :mod:`.tracing`.
+"""
+
+import abc
+import atexit
+import collections
+import contextlib
+import json
+import multiprocessing.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, Generic, Iterator, List, Optional, TextIO, TypeVar
+
+T = TypeVar("T")
+
+
+class Stats:
+    """
+    The statistics of a single process.
+
+    :ivar counters: Counts events by name, such as ``"files"``.
+    :ivar phases: The time spent in each phase of the checker, in seconds.
+    :ivar errors: Counts reported errors by their code.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = collections.Counter()
+        self.phases: Dict[str, float] = collections.defaultdict(float)
+        self.errors: Dict[str, int] = collections.Counter()
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] += n
+
+    @contextlib.contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        """Adds the time spent within the ``with`` block to a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - start
+
+    def merge(self, other: "Stats") -> None:
+        self.counters.update(other.counters)
+        for phase, seconds in other.phases.items():
+            self.phases[phase] += seconds
+        self.errors.update(other.errors)
+
+    def to_json(self) -> dict:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "phases": dict(self.phases),
+            "errors": dict(sorted(self.errors.items())),
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> "Stats":
+        stats = Stats()
+        stats.counters.update(data["counters"])
+        stats.phases.update(data["phases"])
+        stats.errors.update(data["errors"])
+        return stats
+
+
+class Collector(abc.ABC, Generic[T]):
+    """
+    Collects data of type ``T`` in all processes of a run and reports it once.
+
+    The process that creates the first collector of a kind owns it and
+    reports the merged data of all processes when it exits. Collectors that
+    are copied into forked worker processes, or created anew in spawned ones,
+    write the data of their process to the owner's spool directory instead.
+
+    Subclasses define the type of the data and how it is reported.
+    """
+
+    # The environment variable that tells worker processes which were started
+    # without forking where the spool directory is.
+    spool_variable: str
+
+    def __init__(self, output: str):
+        """
+        :param output: Where to report the data to, as understood by :meth:`_write`.
+        """
+        self.output = output
+        self.spool = os.environ.get(self.spool_variable)
+        self._owner_pid: Optional[int] = None
+        if self.spool is None:
+            self.spool = tempfile.mkdtemp(prefix="tyc-")
+            os.environ[self.spool_variable] = self.spool
+            self._owner_pid = os.getpid()
+            atexit.register(self.report)
+        self._data: Optional[T] = None
+        self._data_pid: Optional[int] = None
+
+    def __getstate__(self) -> dict:
+        return dict(self.__dict__, _data=None, _data_pid=None)
+
+    def current(self) -> T:
+        """
+        :return: The data of the current process.
+        """
+        pid = os.getpid()
+        if self._data_pid != pid:
+            self._data = self._create()
+            self._data_pid = pid
+            if pid != self._owner_pid:
+                # Worker processes do not run atexit handlers.
+                multiprocessing.util.Finalize(
+                    None, self._flush, args=(self._data,), exitpriority=10
+                )
+        return self._data
+
+    def report(self) -> None:
+        """
+        Merges the data of all processes and writes it to the output.
+
+        This is called automatically when the owning process exits, unless it
+        has been called before.
+        """
+        atexit.unregister(self.report)
+        parts = []
+        if self._data is not None and self._data_pid == os.getpid():
+            parts.append(self._data)
+        for filename in sorted(os.listdir(self.spool)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.spool, filename)) as f:
+                    parts.append(self._load(json.load(f)))
+            except (OSError, ValueError, KeyError):
+                continue
+        shutil.rmtree(self.spool, ignore_errors=True)
+        os.environ.pop(self.spool_variable, None)
+        self._write(parts)
+
+    @abc.abstractmethod
+    def _create(self) -> T: ...
+
+    @abc.abstractmethod
+    def _dump(self, data: T) -> dict: ...
+
+    @abc.abstractmethod
+    def _load(self, data: dict) -> T: ...
+
+    @abc.abstractmethod
+    def _write(self, parts: List[T]) -> None:
+        """
+        Reports the data.
+
+        :param parts: The data of each process that took part in the run.
+        """
+
+    def _flush(self, data: T) -> None:
+        path = os.path.join(self.spool, f"{os.getpid()}.json")
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._dump(data), f)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+
+class StatsCollector(Collector[Stats]):
+    """
+    Collects :class:`Stats` in all processes of a run and reports their sum,
+    as a summary on stderr if the output is ``"-"`` or else as a JSON file.
+    """
+
+    spool_variable = "FLAKE8_TYPING_COLLECTIONS_STATS_SPOOL"
+
+    def _create(self) -> Stats:
+        return Stats()
+
+    def _dump(self, data: Stats) -> dict:
+        return data.to_json()
+
+    def _load(self, data: dict) -> Stats:
+        return Stats.from_json(data)
+
+    def _write(self, parts: List[Stats]) -> None:
+        total = Stats()
+        for stats in parts:
+            total.merge(stats)
+        total.counters["processes"] = len(parts)
+        if self.output == "-":
+            _write_summary(total, sys.stderr)
+        else:
+            with open(self.output, "w", encoding="utf-8") as f:
+                json.dump(total.to_json(), f, indent=2)
+
+
+def _write_summary(stats: Stats, stream: TextIO) -> None:
+    rows = [
+        (name, str(value)) for name, value in sorted(stats.counters.items())
+    ]
+    rows += [
+        (f"time {phase}", f"{seconds * 1000:.1f} ms")
+        for phase, seconds in stats.phases.items()
+    ]
+    rows += [
+        (f"errors {code}", str(n)) for code, n in sorted(stats.errors.items())
+    ]
+    width = max(len(name) for name, _ in rows)
+    stream.write("flake8-typing-collections statistics:\n")
+    for name, value in rows:
+        stream.write(f"  {name.ljust(width)}  {value.rjust(10)}\n")
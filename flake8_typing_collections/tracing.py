@@ -0,0 +1,111 @@
+"""
+Records spans of the checker for each file and phase.
+
+The spans are written in the Chrome trace-event format, which can be
+opened in Perfetto (https://ui.perfetto.dev) or ``chrome://tracing``. Each
+process of a run records its own trace, and all traces are merged into
+a single file at the end, with one track per process.
+"""
+
+import contextlib
+import json
+import os
+import time
+from typing import Dict, Iterator, List
+
+from flake8_typing_collections.stats import Collector
+
+
+class Trace:
+    """
+    The spans recorded by a single process.
+
+    :ivar events: The recorded trace events.
+    """
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self._pid = os.getpid()
+
+    @contextlib.contextmanager
+    def span(
+        self, name: str, category: str = "phase", **args: object
+    ) -> Iterator[Dict[str, object]]:
+        """
+        Records the ``with`` block as a span.
+
+        :param name: The name of the span, such as the checked file or a phase.
+        :param category: The category of the span.
+        :param args: Arguments shown with the span. The yielded dict can be used to add more of them within the block.
+        """
+        start = time.time_ns()
+        try:
+            yield args
+        finally:
+            self.add(name, category, start, time.time_ns(), **args)
+
+    def add(
+        self, name: str, category: str, start: int, end: int, **args: object
+    ) -> None:
+        """
+        Records a span that has already ended.
+
+        :param start: The start of the span, as returned by :func:`time.time_ns`.
+        :param end: The end of the span, as returned by :func:`time.time_ns`.
+        """
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (end - start) / 1000,
+                "pid": self._pid,
+                "tid": self._pid,
+                "args": args,
+            }
+        )
+
+    def timed(self, phase: str) -> Iterator[Dict[str, object]]:
+        """Records the ``with`` block as a span of a phase of the checker."""
+        return self.span(phase)
+
+
+class TraceCollector(Collector[Trace]):
+    """
+    Collects a :class:`Trace` in all processes of a run and writes them to
+    a single JSON file in the Chrome trace-event format.
+    """
+
+    spool_variable = "FLAKE8_TYPING_COLLECTIONS_TRACE_SPOOL"
+
+    def _create(self) -> Trace:
+        return Trace()
+
+    def _dump(self, data: Trace) -> dict:
+        return {"traceEvents": data.events}
+
+    def _load(self, data: dict) -> Trace:
+        trace = Trace()
+        trace.events = data["traceEvents"]
+        return trace
+
+    def _write(self, parts: List[Trace]) -> None:
+        events = []
+        for trace in parts:
+            pids = {event["pid"] for event in trace.events}
+            for pid in pids:
+                events.append(
+                    {
+                        "name": "process_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": pid,
+                        "args": {"name": f"flake8-typing-collections {pid}"},
+                    }
+                )
+            events.extend(trace.events)
+        with open(self.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"}, f, indent=1
+            )
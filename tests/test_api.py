@@ -0,0 +1,147 @@
+import ast
+import textwrap
+
+import flake8.api.legacy
+import pytest
+
+from flake8_typing_collections import (
+    DEFAULT_FLAGS,
+    Budget,
+    Flags,
+    Violation,
+    check_source,
+    check_tree,
+)
+from flake8_typing_collections.checker import Checker, configured_checker
+
+CODE = """
+from collections.abc import Iterable, Sized
+from typing import Dict
+def foo(a: Iterable, b: Sized, c: Dict) -> list:
+    ...
+"""
+
+
+def test_check_source():
+    violations = check_source(textwrap.dedent(CODE))
+    assert [(v.line, v.col, v.code) for v in violations] == [
+        (4, 11, "TYC100"),
+        (4, 34, "TYC202"),
+        (4, 43, "TYC115"),
+    ]
+    assert violations[0] == Violation(
+        4,
+        11,
+        "TYC100",
+        "Use typing.Iterable instead of collections.abc.Iterable in type annotations.",
+    )
+
+
+def test_flags():
+    violations = check_source(
+        textwrap.dedent(CODE),
+        Flags(generic_alt=False, alias_alt=True, general_args=False),
+    )
+    assert [(v.line, v.col, v.code) for v in violations] == [(4, 24, "TYC105")]
+
+
+CODE_TYPE_IGNORE = """
+def foo(a: list) -> dict:  # type: ignore
+    ...
+def bar(a: Dict[
+    str, list]  # type: ignore
+):
+    ...
+def baz(a: set):
+    ...
+"""
+
+
+def test_type_ignore():
+    tree = ast.parse(textwrap.dedent(CODE_TYPE_IGNORE), type_comments=True)
+    violations = check_tree(tree)
+    assert [(v.line, v.col, v.code) for v in violations] == [(8, 11, "TYC116")]
+
+
+CODE_MULTI_LINE_TYPE_IGNORE = """
+x: int  # type: ignore
+def foo(a: Dict[
+    str,
+    list,
+]) -> None:
+    ...
+def bar(a: Dict[
+    str,
+    list,  # type: ignore
+]) -> None:
+    ...
+def baz(a: Dict[
+    str,
+    list,
+]) -> None:  # type: ignore
+    ...
+def qux(a: Dict[str, list]) -> None:
+    ...
+y: int  # type: ignore
+"""
+
+
+def test_type_ignore_multi_line():
+    tree = ast.parse(
+        textwrap.dedent(CODE_MULTI_LINE_TYPE_IGNORE), type_comments=True
+    )
+    violations = check_tree(tree)
+    # Only comments on the lines spanned by an annotation apply to it.
+    assert [(v.line, v.code) for v in violations] == [
+        (5, "TYC115"),
+        (18, "TYC115"),
+    ]
+
+
+def test_class_settings_do_not_apply(monkeypatch):
+    # As set by flake8 in the same process.
+    monkeypatch.setattr(Checker, "budget", Budget(max_annotations=0))
+    monkeypatch.setattr(Checker, "resolver_backend", "symtable")
+    violations = check_source("def f(x: list): ...")
+    assert [v.code for v in violations] == ["TYC115"]
+
+
+def test_budget():
+    violations = check_source(
+        "def f(x: list, y: set): ...", budget=Budget(max_annotations=1)
+    )
+    assert [v.code for v in violations] == ["TYC115", "TYC001"]
+
+
+def test_flake8_keeps_default_flags(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("flags", "rules", "budget", "resolver_backend"):
+        monkeypatch.setattr(Checker, name, getattr(Checker, name))
+    for _ in range(2):
+        flake8.api.legacy.get_style_guide()
+    assert DEFAULT_FLAGS == Flags(
+        generic_alt=True, alias_alt=False, general_args=True
+    )
+    violations = check_source("def f(x: list): ...")
+    assert [v.code for v in violations] == ["TYC115"]
+
+
+def test_checker_classes_are_reused():
+    assert configured_checker() is configured_checker()
+    assert configured_checker(
+        budget=Budget(max_annotations=1)
+    ) is not configured_checker(budget=Budget(max_annotations=2))
+
+
+def test_symtable_backend_without_unparse(monkeypatch):
+    # As on Python 3.8, where check_source passes the source code on.
+    monkeypatch.delattr(ast, "unparse", raising=False)
+    source = textwrap.dedent("""
+        from typing import List
+        def f(List: int):
+            def g(x: List): ...
+        """)
+    assert [v.code for v in check_source(source)] == ["TYC200"]
+    assert check_source(source, resolver_backend="symtable") == []
+    with pytest.raises(ValueError):
+        check_tree(ast.parse(source), resolver_backend="symtable")
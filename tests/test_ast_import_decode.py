@@ -1,7 +1,15 @@
 import ast
+import sys
 import textwrap
 
-from flake8_typing_collections.ast_import_decode import decode
+import pytest
+
+from flake8_typing_collections.ast_import_decode import (
+    ModuleResolver,
+    SymtableResolver,
+    decode,
+    make_resolver,
+)
 
 CODE_NOOP = """
 import os.path
@@ -196,3 +204,170 @@ def test_nontrivial_assign():
     decode(tree, node1.value)
     decode(tree, node2.value.func)
     decode(tree, node3)
+
+
+def test_module_resolver():
+    tree = ast.parse(CODE_ANCESTRY)
+    resolver = ModuleResolver(tree)
+    nodes = [stmt.value for stmt in tree.body[1].body[2].body[1:]]
+    names = [resolver.decode(node) for node in nodes]
+    assert names == [decode(tree, node) for node in nodes]
+    assert names == [
+        "typing.List",
+        "typing.Dict",
+        "Union",
+        "typing.Tuple",
+        "typing.Set",
+    ]
+
+
+CODE_SCOPE_CHAIN = """
+from os import path as p
+from typing import List
+
+def f():
+    from collections import OrderedDict as List
+    X = p
+
+    List
+    X
+    
+List
+"""
+
+
+def test_scope_chain():
+    tree = ast.parse(CODE_SCOPE_CHAIN)
+    node1 = tree.body[2].body[2].value
+    node2 = tree.body[2].body[3].value
+    node3 = tree.body[3].value
+    name1 = decode(tree, node1)
+    name2 = decode(tree, node2)
+    name3 = decode(tree, node3)
+    assert name1 == "collections.OrderedDict"
+    assert name2 == "os.path"
+    assert name3 == "typing.List"
+
+
+CODE_SHARED_HEADER = """
+from typing import List as L
+import collections.abc as cabc
+Seq = cabc.Sequence
+
+def f{}():
+    L
+"""
+
+
+def test_module_tables_are_shared():
+    resolvers = [
+        ModuleResolver(ast.parse(CODE_SHARED_HEADER.format(i)))
+        for i in range(2)
+    ]
+    tables = [resolver.scope_chain(resolver.tree) for resolver in resolvers]
+    assert tables[0] == (
+        {
+            "L": "typing.List",
+            "cabc": "collections.abc",
+            "Seq": "cabc.Sequence",
+        },
+    )
+    assert tables[0][0] is tables[1][0]
+    for resolver in resolvers:
+        node = resolver.tree.body[3].body[0].value
+        assert resolver.decode(node) == "typing.List"
+
+
+CODE_PYTHON_SCOPES = """
+from typing import List
+if TYPE_CHECKING:
+    from typing import Dict
+
+class C:
+    from typing import Tuple
+
+    def m(self, List: int) -> Tuple:
+        List
+        Tuple
+        Dict
+
+def g():
+    global Set
+    from typing import Set
+    Set
+"""
+
+
+@pytest.mark.parametrize(
+    "with_source",
+    [
+        True,
+        pytest.param(
+            False,
+            marks=pytest.mark.skipif(
+                sys.version_info < (3, 9), reason="No ast.unparse"
+            ),
+        ),
+    ],
+)
+def test_symtable_backend(with_source):
+    tree = ast.parse(CODE_PYTHON_SCOPES)
+    method = tree.body[2].body[1]
+    nodes = [method.returns] + [stmt.value for stmt in method.body]
+    nodes.append(tree.body[3].body[2].value)
+    source = CODE_PYTHON_SCOPES if with_source else None
+    resolver = make_resolver(tree, "symtable", source)
+    assert isinstance(resolver, SymtableResolver)
+    assert [resolver.decode(node) for node in nodes] == [
+        "typing.Tuple",
+        "List",
+        "Tuple",
+        "typing.Dict",
+        "Set",
+    ]
+    assert [decode(tree, node, "symtable", source) for node in nodes] == [
+        resolver.decode(node) for node in nodes
+    ]
+    assert [decode(tree, node) for node in nodes] == [
+        "typing.Tuple",
+        "typing.List",
+        "typing.Tuple",
+        "Dict",
+        "typing.Set",
+    ]
+
+
+def test_symtable_backend_needs_source(monkeypatch):
+    # As on Python 3.8.
+    monkeypatch.delattr(ast, "unparse", raising=False)
+    tree = ast.parse(CODE_PYTHON_SCOPES)
+    with pytest.raises(ValueError):
+        make_resolver(tree, "symtable")
+    make_resolver(tree, "symtable", CODE_PYTHON_SCOPES)
+
+
+def test_symtable_backend_fingerprints_headers():
+    source = textwrap.dedent("""
+        class A:
+            from typing import List as X
+            def f(self, x: X): ...
+        class B:
+            from typing import Dict as X
+            def f(self, x: X): ...
+        """)
+    tree = ast.parse(source)
+    resolver = make_resolver(tree, "symtable", source)
+    methods = [tree.body[0].body[1], tree.body[1].body[1]]
+    assert resolver.scope_chain(methods[0]) == resolver.scope_chain(methods[1])
+    assert resolver.scope_fingerprint(methods[0]) != resolver.scope_fingerprint(
+        methods[1]
+    )
+    assert [resolver.decode(m.args.args[1].annotation) for m in methods] == [
+        "typing.List",
+        "typing.Dict",
+    ]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        make_resolver(ast.parse(""), "cst")
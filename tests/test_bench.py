@@ -0,0 +1,41 @@
+import ast
+import json
+
+from flake8_typing_collections import check_source
+from flake8_typing_collections.bench import runner, synthetic
+
+
+def test_synthetic_module():
+    source = synthetic.module(
+        functions=20, imports=5, nesting=3, attribute_chain=4, try_blocks=2
+    )
+    tree = ast.parse(source)
+    functions = [
+        node for node in tree.body if isinstance(node, ast.FunctionDef)
+    ]
+    assert len(functions) == 20
+    assert check_source(source)
+
+
+def test_main(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    exit_code = runner.main(
+        [
+            "--corpus",
+            "annotations",
+            "--corpus",
+            "nesting",
+            "--scale",
+            "0.01",
+            "--repeat",
+            "1",
+            "--output",
+            str(output),
+        ]
+    )
+    assert exit_code == 0
+    assert "annotations" in capsys.readouterr().out
+    results = json.loads(output.read_text())["results"]
+    assert set(results) == {"annotations", "nesting"}
+    assert results["annotations"]["annotations"] == 60
+    assert set(results["nesting"]["phases"]) == set(runner.PHASES)
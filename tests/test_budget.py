@@ -0,0 +1,49 @@
+from tests.util import BaseTest
+
+CODE = """
+from typing import Dict
+x: Dict[str, Dict[str, Dict[str, list]]]
+y: list
+z: list
+"""
+
+
+class TestBudget_1(BaseTest):
+    @classmethod
+    def flags(cls):
+        return ["--tyc_max_annotations=2"]
+
+    def test_max_annotations(self):
+        errors = self.run_flake8(CODE)
+        assert len(errors) == 3
+        self.assert_error_at(errors, "TYC115", 3, 34)
+        self.assert_error_at(errors, "TYC115", 4, 4)
+        self.assert_error_at(errors, "TYC001", 5, 4)
+
+
+class TestBudget_2(BaseTest):
+    @classmethod
+    def flags(cls):
+        return ["--tyc_max_depth=2"]
+
+    def test_max_depth(self):
+        errors = self.run_flake8(CODE)
+        assert len(errors) == 1
+        self.assert_error_at(errors, "TYC001", 3, 24)
+        assert "nested deeper than 2" in errors[0].message
+
+    def test_within_budget(self):
+        errors = self.run_flake8(CODE.replace("Dict[str, list]", "list"))
+        assert len(errors) == 3
+        assert all(error.code == "TYC115" for error in errors)
+
+
+class TestBudget_3(BaseTest):
+    @classmethod
+    def flags(cls):
+        return ["--tyc_max_seconds=0"]
+
+    def test_max_seconds(self):
+        errors = self.run_flake8(CODE)
+        assert len(errors) == 1
+        self.assert_error_at(errors, "TYC001", 3, 4)
@@ -0,0 +1,35 @@
+import json
+
+from tests.util import BaseTest
+
+CODE = """
+def foo(x: list):
+    ...
+"""
+
+
+class TestCache(BaseTest):
+    @classmethod
+    def flags(cls):
+        return ["--tyc_generic_alt", "--tyc_cache_dir=.tyc_cache"]
+
+    def test_cache_is_written(self):
+        errors = self.run_flake8(CODE)
+        self.assert_error_at(errors, "TYC115", 2, 12)
+        entries = list((self.flake8_path / ".tyc_cache").glob("*/*.json"))
+        assert len(entries) == 1
+        assert json.loads(entries[0].read_text()) == [
+            [2, 11, errors[0].code + " " + errors[0].message]
+        ]
+
+    def test_cache_is_replayed(self):
+        self.run_flake8(CODE)
+        for entry in (self.flake8_path / ".tyc_cache").glob("*/*.json"):
+            entry.write_text("[]")
+        errors = self.run_flake8(CODE)
+        assert errors == []
+
+    def test_changed_file_is_checked(self):
+        self.run_flake8(CODE)
+        errors = self.run_flake8(CODE.replace("list", "set"))
+        self.assert_error_at(errors, "TYC116", 2, 12)
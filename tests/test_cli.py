@@ -0,0 +1,119 @@
+import json
+import textwrap
+
+import pytest
+
+from flake8_typing_collections.checker import Budget, Checker
+from flake8_typing_collections.cli import main
+
+CODE_1 = """
+from collections.abc import Iterable, Sized
+def foo(a: Iterable, b: Sized) -> list:
+    ...
+"""
+
+CODE_2 = """
+import typing
+def foo(a: typing.List):
+    ...
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text(textwrap.dedent(CODE_1))
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "b.py").write_text(textwrap.dedent(CODE_2))
+    (tmp_path / "pkg" / "c.txt").write_text(textwrap.dedent(CODE_1))
+    (tmp_path / ".tox").mkdir()
+    (tmp_path / ".tox" / "d.py").write_text(textwrap.dedent(CODE_1))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_default_flags(project, capsys, jobs):
+    exit_code = main(["--jobs", jobs, "--batch_size", "1"])
+    lines = sorted(capsys.readouterr().out.splitlines())
+    assert exit_code == 1
+    assert [line.split(" ")[0] for line in lines] == [
+        "./a.py:3:12:",
+        "./a.py:3:35:",
+        "./pkg/b.py:3:12:",
+    ]
+    assert lines[0].startswith("./a.py:3:12: TYC100 Use typing.Iterable")
+
+
+def test_flags(project, capsys):
+    exit_code = main(["--tyc_alias_alt", "--jobs", "1", "a.py"])
+    assert exit_code == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "a.py:3:25: TYC105 Use typing.Sized instead of collections.abc.Sized in type annotations."
+    ]
+
+
+def test_select(project, capsys):
+    exit_code = main(["--select", "TYC2", "--jobs", "1"])
+    assert exit_code == 1
+    assert [
+        line.split(" ")[:2] for line in capsys.readouterr().out.splitlines()
+    ] == [["./pkg/b.py:3:12:", "TYC200"]]
+
+
+def test_no_errors(project, capsys):
+    exit_code = main(["--ignore", "TYC", "--jobs", "1"])
+    assert exit_code == 0
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_stats(project, capsys, jobs):
+    main(["--tyc_stats=stats.json", "--jobs", jobs, "--batch_size", "1"])
+    stats = json.loads((project / "stats.json").read_text())
+    assert stats["counters"]["files"] == 2
+    assert stats["counters"]["annotation_sites"] == 4
+    assert stats["counters"]["decode_calls"] == 3
+    assert stats["counters"]["processes"] == int(jobs)
+    assert stats["errors"] == {"TYC100": 1, "TYC115": 1, "TYC200": 1}
+    assert set(stats["phases"]) >= {"index", "decode", "total"}
+
+
+def test_resolver_backend(tmp_path, monkeypatch, capsys):
+    (tmp_path / "a.py").write_text(textwrap.dedent("""
+            from typing import List
+
+            def foo(List: int) -> None:
+                def bar(x: List) -> None:
+                    ...
+            """))
+    monkeypatch.chdir(tmp_path)
+    assert main(["--jobs", "1", "--tyc_general_args"]) == 1
+    capsys.readouterr()
+    argv = ["--jobs", "1", "--tyc_general_args", "--tyc_resolver", "symtable"]
+    assert main(argv) == 0
+
+
+def test_settings_do_not_leak(project, capsys):
+    argv = ["--jobs", "1", "--tyc_max_annotations", "0"]
+    main(argv + ["--tyc_resolver", "symtable", "--tyc_stats", "-"])
+    assert Checker.budget == Budget()
+    assert Checker.resolver_backend == "ast"
+    assert Checker.stats is None
+
+
+@pytest.mark.parametrize(
+    "selection, expected",
+    [
+        ([], ["TYC115", "TYC001"]),
+        (["--ignore", "TYC001"], ["TYC115"]),
+        (["--select", "TYC1"], ["TYC115"]),
+    ],
+)
+def test_budget_error_is_selected(
+    tmp_path, monkeypatch, capsys, selection, expected
+):
+    (tmp_path / "a.py").write_text("x: list\ny: list\n")
+    monkeypatch.chdir(tmp_path)
+    main(["--jobs", "1", "--tyc_max_annotations", "1", "a.py"] + selection)
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" ")[1] for line in lines] == expected
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from flake8_typing_collections import client
+from flake8_typing_collections.checker import ERROR_MESSAGES
+
+
+@pytest.fixture
+def socket_path():
+    # Unix domain socket paths are limited to about 100 characters.
+    directory = tempfile.mkdtemp()
+    yield os.path.join(directory, "tyc.sock")
+    os.rmdir(directory)
+
+
+@pytest.fixture
+def daemon(socket_path, tmp_path):
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "flake8_typing_collections.daemon",
+            "--socket",
+            socket_path,
+            "--tyc_general_args",
+        ],
+        cwd=tmp_path,
+    )
+    deadline = time.monotonic() + 30
+    # The socket file exists before the daemon listens on it, so wait for
+    # it to answer a request instead.
+    probe = {"probe.py": ""}
+    while client.request(socket_path, ["--tyc_general_args"], probe) is None:
+        assert process.poll() is None
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    yield socket_path
+    client.shutdown(socket_path)
+    process.wait(timeout=30)
+
+
+def test_check_files(daemon, tmp_path, monkeypatch, capsys):
+    (tmp_path / "a.py").write_text(
+        "from typing import List\ndef foo(x: List): ...\n"
+    )
+    (tmp_path / "b.py").write_text("def foo(x: int) -> (:\n")
+    monkeypatch.chdir(tmp_path)
+    for _ in range(2):
+        assert client.main(["--socket", daemon, "--tyc_general_args"]) == 1
+        lines = capsys.readouterr().out.splitlines()
+        assert [line.split(" ")[:2] for line in lines] == [
+            ["./a.py:2:12:", "TYC200"]
+        ]
+    assert client.request(daemon, ["--tyc_general_args", "b.py"]) == []
+
+
+def test_check_sources(daemon):
+    assert client.check(
+        daemon,
+        ["--tyc_general_args"],
+        {"buffer.py": "from typing import Dict\ndef foo(x: Dict): ..."},
+    ) == [("buffer.py", 2, 11, "TYC202 " + ERROR_MESSAGES[202])]
+
+
+def test_falls_back_for_other_options(daemon, tmp_path, monkeypatch, capsys):
+    (tmp_path / "a.py").write_text("def foo(x: list): ...\n")
+    monkeypatch.chdir(tmp_path)
+    assert client.request(daemon, ["--tyc_generic_alt"]) is None
+    assert client.main(["--socket", daemon, "--tyc_generic_alt"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out.split(" ")[:2] == ["./a.py:1:12:", "TYC115"]
+    assert "other options" in captured.err
+
+
+def test_falls_back_without_daemon(socket_path, tmp_path, monkeypatch, capsys):
+    (tmp_path / "a.py").write_text("def foo(x: list): ...\n")
+    monkeypatch.chdir(tmp_path)
+    assert client.request(socket_path, []) is None
+    assert client.main(["--socket", socket_path, "--jobs", "1"]) == 1
+    assert capsys.readouterr().out.split(" ")[:2] == ["./a.py:1:12:", "TYC115"]
+    assert client.check(socket_path, [], {"x.py": "y: set"}) == [
+        ("x.py", 1, 3, "TYC116 " + ERROR_MESSAGES[116])
+    ]
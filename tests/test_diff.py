@@ -0,0 +1,124 @@
+import os
+import subprocess
+import textwrap
+
+from flake8_typing_collections.cli import main
+from flake8_typing_collections.diff import parse_diff
+
+
+def test_parse_diff(tmp_path):
+    diff = textwrap.dedent("""\
+        diff --git a/a.py b/a.py
+        --- a/a.py
+        +++ b/a.py
+        @@ -3 +3 @@ import typing
+        -x = 1
+        +x = 2
+        @@ -10,0 +11,3 @@ def f():
+        +a
+        +b
+        +c
+        @@ -20,2 +23,0 @@
+        -d
+        -e
+        diff --git a/old.py b/old.py
+        --- a/old.py
+        +++ /dev/null
+        @@ -1 +0,0 @@
+        -y = 1
+        diff --git a/new.py b/new.py
+        --- /dev/null
+        +++ b/new.py
+        @@ -0,0 +1,2 @@
+        +z = 1
+        +w = 2
+        """)
+    root = str(tmp_path)
+    changed = parse_diff(diff, root)
+    assert sorted(changed) == [
+        os.path.join(root, "a.py"),
+        os.path.join(root, "new.py"),
+    ]
+    a = changed[os.path.join(root, "a.py")]
+    assert a.overlaps(3, 3)
+    assert not a.overlaps(4, 10)
+    assert a.overlaps(13, 13)
+    assert not a.overlaps(14, 22)
+    assert a.overlaps(23, 23)
+    assert changed[os.path.join(root, "new.py")].overlaps(2, 5)
+
+
+def test_parse_diff_added_line_like_header(tmp_path):
+    diff = textwrap.dedent("""\
+        diff --git a/a.py b/a.py
+        --- a/a.py
+        +++ b/a.py
+        @@ -1,0 +2,2 @@
+        +++ b/other.py
+        +++ /dev/null
+        @@ -5 +7 @@
+        -x = 1
+        +x = 2
+        """)
+    root = str(tmp_path)
+    changed = parse_diff(diff, root)
+    assert sorted(changed) == [os.path.join(root, "a.py")]
+    assert changed[os.path.join(root, "a.py")].overlaps(7, 7)
+
+
+def _git(*args, cwd):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + list(args),
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def test_cli(tmp_path, monkeypatch, capsys):
+    (tmp_path / "changed.py").write_text(textwrap.dedent("""\
+            from typing import List
+
+            def foo(x: List[int]) -> List[int]:
+                ...
+
+            def bar(x: int) -> int:
+                ...
+            """))
+    (tmp_path / "unchanged.py").write_text(
+        "import typing\ndef baz(x: typing.List[int]): ...\n"
+    )
+    _git("init", "-q", cwd=tmp_path)
+    _git("add", ".", cwd=tmp_path)
+    _git("commit", "-q", "-m", "base", cwd=tmp_path)
+    (tmp_path / "changed.py").write_text(textwrap.dedent("""\
+            from typing import List
+
+            def foo(x: List[int]) -> List[int]:
+                ...
+
+            def bar(x: List[int],
+                    y: int) -> int:
+                ...
+            """))
+    monkeypatch.chdir(tmp_path)
+
+    assert main(["--jobs", "1", "--tyc_general_args", "."]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+
+    assert (
+        main(["--jobs", "1", "--tyc_general_args", "--tyc_diff", "HEAD", "."])
+        == 1
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" ")[:2] for line in lines] == [
+        [os.path.join(".", "changed.py") + ":6:12:", "TYC200"]
+    ]
+
+    assert (
+        main(["--jobs", "1", "--tyc_general_args", "--tyc_diff", "nope", "."])
+        == 2
+    )
+    assert "git diff failed" in capsys.readouterr().err
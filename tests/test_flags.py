@@ -94,3 +94,20 @@ class TestFlags_7(BaseTest):
         assert self.error_at(errors, "TYC100", 4, 12)
         assert self.error_at(errors, "TYC105", 4, 25)
         assert self.error_at(errors, "TYC202", 4, 35)
+
+
+class TestFlags_8(BaseTest):
+    @classmethod
+    def flags(cls) -> List[str]:
+        return [
+            "--tyc_generic_alt",
+            "--tyc_alias_alt",
+            "--tyc_general_args",
+            "--extend-ignore=TYC1",
+        ]
+
+    def test_flags(self):
+        errors = self.run_flake8(CODE)
+        assert not self.error_at(errors, "TYC100", 4, 12)
+        assert not self.error_at(errors, "TYC105", 4, 25)
+        assert self.error_at(errors, "TYC202", 4, 35)
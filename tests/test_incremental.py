@@ -0,0 +1,107 @@
+import random
+import textwrap
+
+from flake8_typing_collections import (
+    Budget,
+    Flags,
+    check_incrementally,
+    check_source,
+)
+from flake8_typing_collections.bench import synthetic
+from flake8_typing_collections.checker import Checker, LineRanges
+
+CODE = textwrap.dedent("""
+    from typing import Dict, List
+
+    def foo(x: List) -> list:
+        ...
+
+    class A:
+        def bar(self, x: Dict) -> None:
+            ...
+
+        y: set
+    """)
+
+
+def _positions(violations):
+    return [(v.line, v.col, v.code) for v in violations]
+
+
+def test_unchanged():
+    violations, snapshot = check_incrementally(CODE)
+    assert violations == check_source(CODE)
+    assert snapshot.rechecked == 4
+    again, snapshot = check_incrementally(CODE, snapshot)
+    assert again == violations
+    assert snapshot.rechecked == 0
+
+
+def test_shifted_lines():
+    _, snapshot = check_incrementally(CODE)
+    edited = CODE.replace("    ...\n", "    x = 1\n    ...\n", 1)
+    violations, snapshot = check_incrementally(edited, snapshot)
+    assert violations == check_source(edited)
+    assert _positions(violations)[-2:] == [(9, 21, "TYC202"), (12, 7, "TYC116")]
+    assert snapshot.rechecked == 1
+
+
+def test_changed_imports():
+    _, snapshot = check_incrementally(CODE)
+    edited = CODE.replace(
+        "from typing import Dict, List", "from typing import Dict"
+    )
+    violations, snapshot = check_incrementally(edited, snapshot)
+    assert violations == check_source(edited)
+    assert snapshot.rechecked == 4
+
+
+def test_changed_flags():
+    _, snapshot = check_incrementally(CODE)
+    flags = Flags(generic_alt=False, alias_alt=False, general_args=True)
+    violations, snapshot = check_incrementally(CODE, snapshot, flags)
+    assert violations == check_source(CODE, flags)
+    assert snapshot.rechecked == 4
+
+
+def test_class_settings_do_not_apply(monkeypatch):
+    # As set by flake8 in the same process.
+    monkeypatch.setattr(Checker, "budget", Budget(max_annotations=0))
+    monkeypatch.setattr(Checker, "resolver_backend", "symtable")
+    violations, _ = check_incrementally(CODE)
+    assert violations == check_source(CODE)
+
+
+def test_settings():
+    budget = Budget(max_annotations=1)
+    violations, snapshot = check_incrementally(CODE, budget=budget)
+    assert violations == check_source(CODE, budget=budget)
+    assert snapshot.segments == ()
+    violations, _ = check_incrementally(CODE, resolver_backend="symtable")
+    assert violations == check_source(CODE, resolver_backend="symtable")
+
+
+def test_random_edits():
+    rng = random.Random(0)
+    lines = synthetic.module(functions=50).splitlines(keepends=True)
+    snapshot = None
+    for _ in range(20):
+        i = rng.randrange(len(lines))
+        if rng.random() < 0.5:
+            lines.insert(i, "\n")
+        elif lines[i].startswith("def "):
+            lines[i] = lines[i].replace("int", "list")
+        source = "".join(lines)
+        violations, snapshot = check_incrementally(source, snapshot)
+        assert violations == check_source(source)
+
+
+def test_line_ranges():
+    ranges = LineRanges([(10, 12), (1, 2), (3, 4), (20, 20)])
+    assert ranges.overlaps(4, 5)
+    assert ranges.overlaps(0, 1)
+    assert ranges.overlaps(12, 30)
+    assert not ranges.overlaps(5, 9)
+    assert not ranges.overlaps(13, 19)
+    assert not ranges.overlaps(21, 100)
+    assert not LineRanges([])
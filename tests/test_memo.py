@@ -0,0 +1,68 @@
+import ast
+import textwrap
+
+from flake8_typing_collections import DEFAULT_FLAGS, check_source
+from flake8_typing_collections.checker import Checker, LRUMemo, compile_rules
+
+CODE_1 = """
+from typing import List
+from collections import OrderedDict as D
+def foo(x: List[D[str, int]]) -> D:
+    ...
+"""
+
+CODE_2 = """
+from typing import List
+from somewhere import Something as D
+def bar(y: List[D[str, int]]) -> D:
+    ...
+"""
+
+
+def run_checker(rules, code):
+    checker = Checker(ast.parse(textwrap.dedent(code)), rules=rules)
+    return sorted(checker.run()), checker.counters
+
+
+def test_verdicts_are_reused():
+    rules = compile_rules(DEFAULT_FLAGS)
+    errors_1, counters = run_checker(rules, CODE_1)
+    assert counters["verdict_misses"] == 2
+    assert len(rules.verdicts) == 2
+    errors_2, counters = run_checker(rules, CODE_1.replace("foo", "bar"))
+    assert counters["verdict_hits"] == 2
+    assert counters["decode_calls"] == 0
+    assert errors_1 == errors_2
+
+
+def test_verdicts_depend_on_aliases():
+    rules = compile_rules(DEFAULT_FLAGS)
+    run_checker(rules, CODE_1)
+    errors, counters = run_checker(rules, CODE_2)
+    assert counters["verdict_misses"] == 2
+    assert [(line, col, message[:6]) for line, col, message, _ in errors] == [
+        (4, 11, "TYC200")
+    ]
+
+
+def test_results_are_anchored_to_nodes():
+    code = CODE_1 + "def baz(x: int,\n        z: List[D[str, int]]): ...\n"
+    assert [(v.line, v.col, v.code) for v in check_source(code)] == [
+        (4, 11, "TYC200"),
+        (4, 16, "TYC130"),
+        (4, 33, "TYC130"),
+        (7, 11, "TYC200"),
+        (7, 16, "TYC130"),
+    ]
+
+
+def test_lru_memo():
+    memo = LRUMemo(2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1
+    memo.put("c", 3)
+    assert memo.get("b") is None
+    assert memo.get("a") == 1
+    assert memo.get("c") == 3
+    assert len(memo) == 2
@@ -37,3 +37,7 @@ class TestNestedTypes(BaseTest):
         errors = self.run_flake8(CODE_NESTED_2XX)
         self.assert_error_at(errors, "TYC200", 3, 12)
         assert len(errors) == 1, str(errors)
+
+    def test_nested_outer_reported_once(self):
+        errors = self.run_flake8(CODE_NESTED_OUTER)
+        assert len(errors) == 1, str(errors)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from flake8_typing_collections.checker import (
+    DEFAULT_FLAGS,
+    Flags,
+    compile_rules,
+)
+from flake8_typing_collections.cli import main
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "def foo(x: list): ...",
+        "import collections.abc as cabc",
+        "from typing import Dict as D",
+        "x: 'typing'",
+        "def foo(x: ｌist): ...",
+    ],
+)
+def test_may_report(source):
+    assert compile_rules(DEFAULT_FLAGS).may_report(source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "",
+        "def foo(x: int) -> str: ...",
+        "import mytyping\nx: lists",
+        "from abc import Iterable",
+    ],
+)
+def test_may_not_report(source):
+    assert not compile_rules(DEFAULT_FLAGS).may_report(source)
+
+
+def test_may_report_depends_on_rules():
+    rules = compile_rules(
+        Flags(generic_alt=False, alias_alt=False, general_args=True)
+    )
+    assert rules.may_report("from typing import List")
+    assert not rules.may_report("def foo(x: list): ...")
+
+
+def test_cli_skips_files_without_candidates(tmp_path, monkeypatch, capsys):
+    (tmp_path / "a.py").write_text("def foo(x: int): ...\n")
+    (tmp_path / "b.py").write_text("def foo(x: list): ...\n")
+    monkeypatch.chdir(tmp_path)
+    assert main(["--jobs", "1", "--tyc_stats", "stats.json"]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" ")[:2] for line in lines] == [
+        ["./b.py:1:12:", "TYC115"]
+    ]
+    stats = json.loads((tmp_path / "stats.json").read_text())
+    assert stats["counters"]["skipped_files"] == 1
+
+
+def test_cli_does_not_report_syntax_errors(tmp_path, monkeypatch, capsys):
+    # Whether or not the file could be skipped without parsing it.
+    (tmp_path / "a.py").write_text("def foo(x: int) -> (:\n")
+    (tmp_path / "b.py").write_text("def foo(x: list) -> (:\n")
+    monkeypatch.chdir(tmp_path)
+    assert main(["--jobs", "1"]) == 0
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,269 @@
+import json
+import mmap
+import os
+import pickle
+import textwrap
+
+from flake8_typing_collections.cli import main
+from flake8_typing_collections.project import (
+    AliasTable,
+    ProjectIndex,
+    scan_module,
+)
+
+
+def _write_project(root):
+    (root / "myproj").mkdir()
+    (root / "myproj" / "__init__.py").write_text("")
+    (root / "myproj" / "typing_compat.py").write_text(textwrap.dedent("""
+            import collections.abc as cabc
+            from typing import List as L
+            Seq = cabc.Sequence
+            Lst = L
+            """))
+    (root / "myproj" / "reexport.py").write_text(
+        "from .typing_compat import Seq as S\n"
+    )
+    (root / "myproj" / "user.py").write_text(textwrap.dedent("""
+            from myproj.typing_compat import Seq
+            from . import reexport
+            from .typing_compat import Lst
+
+            def foo(x: Seq, y: reexport.S, z: Lst[int]) -> int:
+                ...
+            """))
+
+
+def test_scan_module(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text(textwrap.dedent("""
+            import typing
+            import collections.abc as cabc
+            from .. import sibling
+            from .compat import X as Y
+            Seq = cabc.Sequence
+            """))
+    assert scan_module(str(path), "pkg.sub") == {
+        "typing": "typing",
+        "cabc": "collections.abc",
+        "sibling": "pkg.sibling",
+        "Y": "pkg.sub.compat.X",
+        "Seq": "collections.abc.Sequence",
+    }
+
+
+def test_resolve(tmp_path):
+    _write_project(tmp_path)
+    index = ProjectIndex(str(tmp_path))
+    index.update(jobs=1)
+    assert (
+        index.resolve("myproj.typing_compat.Seq") == "collections.abc.Sequence"
+    )
+    assert index.resolve(".reexport.S", "myproj") == "collections.abc.Sequence"
+    assert (
+        index.resolve("..typing_compat.Lst", "myproj") == "..typing_compat.Lst"
+    )
+    assert index.resolve("myproj.reexport.Other") == "myproj.reexport.Other"
+    assert index.package_of(str(tmp_path / "myproj" / "user.py")) == "myproj"
+    assert (
+        index.package_of(str(tmp_path / "myproj" / "__init__.py")) == "myproj"
+    )
+
+
+def test_incremental_update(tmp_path):
+    _write_project(tmp_path)
+    index_path = str(tmp_path / "index.json")
+    index = ProjectIndex.load(index_path, str(tmp_path), jobs=1)
+    fingerprint = index.fingerprint
+    with open(index_path) as f:
+        assert set(json.load(f)["modules"]) == {
+            "myproj",
+            "myproj.typing_compat",
+            "myproj.reexport",
+            "myproj.user",
+        }
+
+    # Touching a file without changing it keeps its aliases.
+    compat = tmp_path / "myproj" / "typing_compat.py"
+    os.utime(compat, ns=(0, 0))
+    index = ProjectIndex.load(index_path, str(tmp_path), jobs=1)
+    assert index.fingerprint == fingerprint
+
+    compat.write_text("Seq = int\n")
+    (tmp_path / "myproj" / "reexport.py").unlink()
+    index = ProjectIndex.load(index_path, str(tmp_path), jobs=1)
+    assert index.fingerprint != fingerprint
+    assert index.resolve("myproj.typing_compat.Seq") == "int"
+    assert "myproj.reexport" not in index.modules
+
+
+def test_cli(tmp_path, monkeypatch, capsys):
+    _write_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    assert main(["--jobs", "1", "myproj/user.py"]) == 0
+    assert (
+        main(
+            [
+                "--jobs",
+                "1",
+                "--tyc_general_args",
+                "--tyc_generic_alt",
+                "--tyc_project_index",
+                "index.json",
+                "myproj/user.py",
+            ]
+        )
+        == 1
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" ")[:2] for line in lines] == [
+        ["myproj/user.py:6:12:", "TYC111"],
+        ["myproj/user.py:6:20:", "TYC111"],
+        ["myproj/user.py:6:35:", "TYC200"],
+    ]
+
+
+def test_flake8(tmp_path, flake8_path):
+    _write_project(flake8_path)
+    result = flake8_path.run_flake8(
+        ["--tyc_project_index", str(tmp_path / "index.json")]
+    )
+    codes = [
+        line.split(" ")[1]
+        for line in result.out_lines
+        if line.split(" ")[1].startswith("TYC")
+    ]
+    assert codes == ["TYC111", "TYC111", "TYC200"]
+
+
+def test_alias_table():
+    aliases = {
+        "pkg.compat": {"Seq": "collections.abc.Sequence", "X": None},
+        "pkg": {f"name{i}": f"target{i}" for i in range(100)},
+    }
+    table = AliasTable(AliasTable.build(aliases, bytes(range(16))))
+    assert table.fingerprint == bytes(range(16))
+    assert table.has_module("pkg.compat")
+    assert not table.has_module("pkg.other")
+    assert table.get("pkg.compat", "Seq") == "collections.abc.Sequence"
+    assert table.get("pkg.compat", "X") is None
+    assert table.get("pkg.compat", "Y") is None
+    assert all(table.get("pkg", f"name{i}") == f"target{i}" for i in range(100))
+    assert sorted(table.items()) == sorted(
+        (module, alias, target)
+        for module, module_aliases in aliases.items()
+        for alias, target in module_aliases.items()
+    )
+
+
+def test_loaded_index_is_memory_mapped(tmp_path):
+    _write_project(tmp_path)
+    index_path = str(tmp_path / "index.json")
+    index = ProjectIndex.load(index_path, str(tmp_path), jobs=1)
+    assert os.path.exists(index_path + ".table")
+    assert isinstance(index._table._buffer, mmap.mmap)
+
+    copy = pickle.loads(pickle.dumps(index))
+    assert copy.modules == {}
+    assert isinstance(copy._table._buffer, mmap.mmap)
+    assert copy.fingerprint == index.fingerprint
+    assert copy.resolve("myproj.reexport.S") == "collections.abc.Sequence"
+
+    # A lost table is written again.
+    os.remove(index_path + ".table")
+    index = ProjectIndex.load(index_path, str(tmp_path), jobs=1)
+    assert isinstance(index._table._buffer, mmap.mmap)
+    assert index.fingerprint == copy.fingerprint
+
+
+def test_dependency_digest(tmp_path):
+    _write_project(tmp_path)
+    (tmp_path / "myproj" / "other.py").write_text("import typing as t\n")
+    index = ProjectIndex(str(tmp_path))
+    index.update(jobs=1)
+    user = index.dependency_digest("myproj.reexport.S")
+    imported = index.dependency_digest("myproj")
+    unrelated = index.dependency_digest("myproj.other")
+
+    # Re-exported aliases depend on the modules they are imported from.
+    (tmp_path / "myproj" / "typing_compat.py").write_text("Seq = list\n")
+    index.update(jobs=1)
+    assert index.dependency_digest("myproj.reexport.S") != user
+    assert index.dependency_digest("myproj") != imported
+    assert index.dependency_digest("myproj.other") == unrelated
+
+
+def test_dependent_results_are_rechecked(tmp_path, monkeypatch, capsys):
+    _write_project(tmp_path)
+    (tmp_path / "myproj" / "other.py").write_text("import typing as t\n")
+    monkeypatch.chdir(tmp_path)
+    argv = [
+        "--jobs",
+        "1",
+        "--tyc_general_args",
+        "--tyc_generic_alt",
+        "--tyc_project_index",
+        "index.json",
+        "--tyc_cache_dir",
+        "cache",
+        "myproj/user.py",
+    ]
+    assert main(argv) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 3
+    (entry,) = (tmp_path / "cache").glob("*/*.json")
+    cached = json.loads(entry.read_text())
+    assert "myproj.typing_compat.Seq" in cached["dependencies"]
+    entry.write_text(json.dumps(dict(cached, results=[])))
+
+    # Modules that the file does not import from do not invalidate it.
+    (tmp_path / "myproj" / "other.py").write_text("import typing as u\n")
+    assert main(argv) == 0
+
+    (tmp_path / "myproj" / "typing_compat.py").write_text("Seq = list\n")
+    assert main(argv) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" ")[:2] for line in lines] == [
+        ["myproj/user.py:6:12:", "TYC115"],
+        ["myproj/user.py:6:20:", "TYC115"],
+    ]
+
+
+def test_plain_imports_are_dependencies(tmp_path, monkeypatch, capsys):
+    (tmp_path / "compat.py").write_text(
+        "import collections.abc\nSeq = collections.abc.Sequence\n"
+    )
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "compat.py").write_text(
+        "import collections.abc\nMap = collections.abc.Mapping\n"
+    )
+    (tmp_path / "user.py").write_text(textwrap.dedent("""
+            import compat
+            import pkg.compat
+
+            def foo(x: compat.Seq, y: pkg.compat.Map) -> None:
+                ...
+            """))
+    monkeypatch.chdir(tmp_path)
+    argv = [
+        "--jobs",
+        "1",
+        "--tyc_generic_alt",
+        "--tyc_project_index",
+        "index.json",
+        "--tyc_cache_dir",
+        "cache",
+        "user.py",
+    ]
+    assert main(argv) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 2
+    (entry,) = (tmp_path / "cache").glob("*/*.json")
+    assert set(json.loads(entry.read_text())["dependencies"]) == {
+        "compat",
+        "pkg.compat",
+    }
+
+    (tmp_path / "compat.py").write_text("Seq = int\n")
+    (tmp_path / "pkg" / "compat.py").write_text("Map = int\n")
+    assert main(argv) == 0
+    assert capsys.readouterr().out == ""
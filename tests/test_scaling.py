@@ -0,0 +1,91 @@
+"""
+Tests that the checker scales linearly with the size of its input.
+
+For each dimension, modules of doubling size are generated and checked.
+The work is measured as the number of function calls while checking,
+including those of built-in functions, which unlike the time taken does
+not depend on the machine or its load. The growth exponent of the work
+is estimated by a least squares fit in log-log space.
+"""
+
+import ast
+import math
+import sys
+from typing import Callable, Sequence
+
+import pytest
+
+from flake8_typing_collections import ast_import_decode
+from flake8_typing_collections.bench import runner, synthetic
+from flake8_typing_collections.checker import Checker, compile_rules
+
+# Growth exponents up to this value are accepted as linear. Quadratic
+# behavior results in exponents close to 2.
+MAX_EXPONENT = 1.15
+
+SIZES = [1, 2, 4, 8]
+
+
+def count_calls(source: str) -> int:
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    # Starts cold, like a new process.
+    ast_import_decode._analyze_module.cache_clear()
+    checker = Checker(tree, lines, rules=compile_rules(runner.ALL_FLAGS))
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event in ("call", "c_call"):
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        list(checker.run())
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def growth_exponent(
+    make_source: Callable[[int], str], sizes: Sequence[int]
+) -> float:
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(count_calls(make_source(size))) for size in sizes]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sum(
+        (x - x_mean) ** 2 for x in xs
+    )
+
+
+@pytest.mark.parametrize(
+    "make_source",
+    [
+        pytest.param(
+            lambda size: synthetic.module(functions=100 * size),
+            id="module-length",
+        ),
+        pytest.param(
+            lambda size: synthetic.module(functions=50, imports=500 * size),
+            id="imports",
+        ),
+        pytest.param(
+            lambda size: synthetic.module(functions=50, try_blocks=250 * size),
+            id="try-blocks",
+        ),
+        pytest.param(
+            lambda size: synthetic.module(functions=50, nesting=8 * size),
+            id="nesting",
+        ),
+        pytest.param(
+            lambda size: synthetic.module(
+                functions=50, attribute_chain=8 * size
+            ),
+            id="attribute-chains",
+        ),
+    ],
+)
+def test_linear_scaling(make_source):
+    exponent = growth_exponent(make_source, SIZES)
+    assert exponent <= MAX_EXPONENT, f"Growth exponent is {exponent:.2f}."
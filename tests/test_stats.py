@@ -0,0 +1,36 @@
+import json
+
+from tests.util import BaseTest
+
+CODE = """
+import typing
+def foo(x: list, y: typing.List[int]) -> int:
+    ...
+"""
+
+
+class TestStats(BaseTest):
+    @classmethod
+    def flags(cls):
+        return [
+            "--tyc_stats=stats.json",
+            "--tyc_cache_dir=.tyc_cache",
+            "--jobs=2",
+        ]
+
+    def test_stats_are_written(self):
+        self.run_flake8(CODE)
+        stats = json.loads((self.flake8_path / "stats.json").read_text())
+        assert stats["counters"]["files"] == 1
+        assert stats["counters"]["annotation_sites"] == 3
+        assert stats["counters"]["prefilter_rejections"] == 3
+        assert stats["counters"]["cache_misses"] == 1
+        assert stats["errors"] == {"TYC115": 1, "TYC200": 1}
+
+    def test_cache_hits_are_counted(self):
+        self.run_flake8(CODE)
+        self.run_flake8(CODE)
+        stats = json.loads((self.flake8_path / "stats.json").read_text())
+        assert stats["counters"]["cache_hits"] == 1
+        assert "decode_calls" not in stats["counters"]
+        assert stats["errors"] == {"TYC115": 1, "TYC200": 1}
@@ -0,0 +1,38 @@
+import json
+
+from tests.util import BaseTest
+
+CODE = """
+def foo(x: list) -> int:
+    ...
+"""
+
+
+class TestTracing(BaseTest):
+    @classmethod
+    def flags(cls):
+        return ["--tyc_trace=trace.json", "--jobs=2"]
+
+    def test_trace_is_written(self):
+        self.run_flake8(CODE)
+        trace = json.loads((self.flake8_path / "trace.json").read_text())
+        events = trace["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        assert sorted(event["name"] for event in spans) == [
+            "./example.py",
+            "decode",
+            "handoff",
+            "index",
+            "matching",
+            "traversal",
+        ]
+        (file_span,) = [event for event in spans if event["cat"] == "file"]
+        assert file_span["args"]["lines"] == 3
+        assert file_span["args"]["annotation_sites"] == 2
+        assert file_span["args"]["errors"] == 1
+        for event in spans:
+            assert file_span["ts"] <= event["ts"]
+            assert (
+                event["ts"] + event["dur"] <= file_span["ts"] + file_span["dur"]
+            )
+        assert any(event["ph"] == "M" for event in events)
@@ -30,3 +30,28 @@ class Test_TYC115(BaseTest):
         """
         result = self.run_flake8(code)
         self.assert_error_at(result, "TYC115", 2, 15)
+
+    def test_fail_3(self):
+        code = """
+        Items = list
+        def foo(x: Items):
+            ...
+        """
+        result = self.run_flake8(code)
+        self.assert_error_at(result, "TYC115", 3, 12)
+
+    def test_fail_4(self):
+        code = """
+        async def foo(x: list):
+            ...
+        """
+        result = self.run_flake8(code)
+        self.assert_error_at(result, "TYC115", 2, 18)
+
+    def test_fail_5(self):
+        code = """
+        class Foo:
+            x: list
+        """
+        result = self.run_flake8(code)
+        self.assert_error_at(result, "TYC115", 3, 8)
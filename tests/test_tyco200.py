@@ -32,3 +32,12 @@ class Test_TYC200(BaseTest):
         """
         result = self.run_flake8(code)
         self.assert_error_at(result, "TYC200", 3, 12)
+
+    def test_fail_2(self):
+        code = """
+        from typing import List as Items
+        def foo(x: Items[int]):
+            ...
+        """
+        result = self.run_flake8(code)
+        self.assert_error_at(result, "TYC200", 3, 12)